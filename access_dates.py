@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Conversión de fechas de Access a texto MySQL (YYYY-MM-DD HH:MM:SS), por columna.
+
+En una columna todas las fechas vienen en el mismo formato y se repiten mucho
+(ej. todo un mes comparte FECLIQUIDA), así que cada columna detecta su formato
+con el primer valor que parsea y memoiza los resultados en un cache acotado.
+Con mdb-export en ISO (-D/-T) los valores ya vienen en formato MySQL y no se parsean.
+"""
+
+import os
+from datetime import datetime
+from functools import lru_cache
+
+MYSQL_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# mdb-export emite las fechas directamente como MySQL (no hay que parsearlas en Python).
+# Cambia el texto de las fechas y por lo tanto el row_hash: conviene correr sync_ALL.py al cambiarlo
+ISO_DATES = os.getenv('COBRANZA_ACCESS_ISO_DATES', '0') == '1'
+
+def mdb_export_date_args():
+    """Argumentos extra de mdb-export según COBRANZA_ACCESS_ISO_DATES"""
+    if not ISO_DATES:
+        return []
+    return ['-D', MYSQL_DATETIME_FORMAT, '-T', MYSQL_DATETIME_FORMAT]
+
+# Formatos en los que puede venir una fecha de mdb-export ("01/27/22 00:00:00" por defecto)
+DATE_FORMATS = ('%m/%d/%y %H:%M:%S', '%m/%d/%Y %H:%M:%S', MYSQL_DATETIME_FORMAT, '%m/%d/%y', '%m/%d/%Y')
+
+# Valores distintos memoizados por columna
+DATE_CACHE_SIZE = int(os.getenv('COBRANZA_DATE_CACHE_SIZE', 4096))
+
+def _is_mysql_datetime(value):
+    """'2022-01-27 00:00:00': ya está en formato MySQL (mdb-export con -D/-T ISO)"""
+    return (len(value) == 19 and value[4] == '-' and value[7] == '-' and value[10] == ' '
+            and value[13] == ':' and value[16] == ':')
+
+class DateColumnConverter:
+    """Convierte los valores de una columna de fecha; None si el valor no es una fecha"""
+
+    def __init__(self, formats=DATE_FORMATS, cache_size=DATE_CACHE_SIZE):
+        self.formats = formats
+        self.format = None  # formato detectado con el primer valor que parsea
+        self._convert_text = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, value):
+        if _is_mysql_datetime(value):
+            return value
+        if self.format is not None:
+            try:
+                return datetime.strptime(value, self.format).strftime(MYSQL_DATETIME_FORMAT)
+            except ValueError:
+                pass  # Valor con otro formato: se prueba la lista completa
+        for fmt in self.formats:
+            try:
+                dt = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            self.format = fmt
+            return dt.strftime(MYSQL_DATETIME_FORMAT)
+        return None
+
+    def __call__(self, value):
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            # Lector nativo: ya viene tipada, no hay nada que parsear
+            return value.strftime(MYSQL_DATETIME_FORMAT)
+        return self._convert_text(value)
+
+    def convert_column(self, values):
+        """Convertir una columna entera: cada valor distinto se convierte una sola vez"""
+        converted = {value: self(value) for value in set(values)}
+        return [converted[value] for value in values]
+
+_COLUMN_CONVERTERS = {}
+
+def date_converter(column, formats=DATE_FORMATS):
+    """Converter compartido de una columna (por nombre), para toda la corrida"""
+    converter = _COLUMN_CONVERTERS.get((column, formats))
+    if converter is None:
+        converter = _COLUMN_CONVERTERS.setdefault((column, formats), DateColumnConverter(formats))
+    return converter
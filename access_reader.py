@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Lectura de las tablas de Access, compartida por sync_ALL.py y sync_INCREMENTAL.py.
+
+Lee cada tabla en streaming (mdb-export o el lector nativo de mdb_reader.py)
+aplicando TABLE_FILTERS mientras lee, guarda el resultado en un cache por corrida
+y exporta varias tablas en paralelo respetando TABLE_DEPENDENCIES.
+"""
+
+import os
+import subprocess
+import csv
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from mdb_reader import MDB_EXPORT_DATE_FORMAT, AccessDatabase, format_value as format_access_value
+from access_dates import ISO_DATES, MYSQL_DATETIME_FORMAT, mdb_export_date_args
+
+ACCESS_DB = os.getenv('COBRANZA_ACCESS_PATH', '/Users/nahuel/Documents/Desarrollos/P_M_Cobranza/BBDD/Datos1.mdb')
+
+# Lector de Access: 'mdbtools' (mdb-export + CSV) o 'native' (mdb_reader.py, sin subprocess).
+# El nativo entrega valores tipados (datetime, Decimal, int...) que van directo a los converters
+# y a MySQL; para el row_hash, los buckets y las claves se pasan al texto de mdb-export (access_text)
+ACCESS_READER = os.getenv('COBRANZA_ACCESS_READER', 'mdbtools')
+
+# Fechas del lector nativo como texto: mismo formato que mdb-export (con -D/-T si COBRANZA_ACCESS_ISO_DATES=1)
+NATIVE_DATE_FORMAT = MYSQL_DATETIME_FORMAT if ISO_DATES else MDB_EXPORT_DATE_FORMAT
+
+def access_text(value):
+    """Texto de un valor de Access como lo imprime mdb-export (los del lector mdbtools ya son texto)"""
+    if type(value) is str:
+        return value
+    return format_access_value(value, NATIVE_DATE_FORMAT)
+
+# 🔥 FILTROS: Solo cobrador 30 y relacionados
+TABLE_FILTERS = {
+    'Cobradores': {
+        'NUMCOB': '30'          # Solo cobrador 30
+    },
+    'Socios': {
+        'COBSOCIO': '30'        # Solo socios del cobrador 30
+    },
+    'Liquidaciones': {
+        'COBLIQUIDA': '30',     # Solo liquidaciones del cobrador 30
+        'BAJA': '1'             # Excluir liquidaciones dadas de baja (BAJA=1)
+    }
+}
+
+def _raw_field(fields, idx):
+    """Valor crudo de un campo CSV por índice (None si no existe, como csv.DictReader)"""
+    return fields[idx] if idx is not None and idx < len(fields) else None
+
+def iter_access_table(table_name, socios_numsocio_list=None):
+    """Leer tabla desde Access en streaming aplicando filtros mientras se lee"""
+    if ACCESS_READER == 'native':
+        return _iter_native_table(table_name, socios_numsocio_list)
+    return _iter_mdb_export_table(table_name, socios_numsocio_list)
+
+def _iter_native_table(table_name, socios_numsocio_list=None):
+    """
+    Leer tabla con el lector nativo (mmap de Datos1.mdb, sin mdb-export).
+    Los filtros se evalúan antes de decodificar el resto de la fila. Los valores
+    quedan tipados (Decimal, datetime, bool...; None = NULL): las fechas no se
+    vuelven a parsear y el row_hash los pasa al texto de mdb-export.
+    """
+    checks = list(TABLE_FILTERS.get(table_name, {}).items())
+    if not (table_name == 'TbComentariosSocios' and socios_numsocio_list):
+        socios_numsocio_list = None
+
+    def predicate(get):
+        for field, value in checks:
+            if (access_text(get(field)) == value) == (field == 'BAJA'):
+                return False
+        if socios_numsocio_list is not None and access_text(get('NUMSOCIO')) not in socios_numsocio_list:
+            return False
+        return True
+
+    use_predicate = bool(checks) or socios_numsocio_list is not None
+    with AccessDatabase(ACCESS_DB) as db:
+        yield from db.iter_rows(table_name, predicate if use_predicate else None)
+
+def _iter_mdb_export_table(table_name, socios_numsocio_list=None):
+    """
+    Leer tabla con mdb-export en streaming.
+
+    Consume la salida de mdb-export de a una línea y evalúa TABLE_FILTERS sobre
+    los campos CSV crudos, así solo se arman dicts para las filas que se quedan.
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(
+            ['mdb-export', *mdb_export_date_args(), ACCESS_DB, table_name],
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True
+        )
+        finished = False
+        try:
+            reader = csv.reader(proc.stdout)
+            header = next(reader, None)
+            if header is not None:
+                index = {col: i for i, col in enumerate(header)}
+                width = len(header)
+
+                # Compilar filtros a (índice, valor, excluir)
+                # BAJA: excluir si BAJA=value (normalmente '1'); otros: incluir solo si campo=value
+                checks = [(index.get(field), value, field == 'BAJA')
+                          for field, value in TABLE_FILTERS.get(table_name, {}).items()]
+
+                # Filtro especial para TbComentariosSocios: solo comentarios de socios filtrados
+                if table_name == 'TbComentariosSocios' and socios_numsocio_list:
+                    numsocio_idx = index.get('NUMSOCIO')
+                else:
+                    numsocio_idx = None
+                    socios_numsocio_list = None
+
+                for fields in reader:
+                    if not fields:
+                        continue  # csv.DictReader también salta líneas vacías
+                    if any((_raw_field(fields, idx) == value) == exclude for idx, value, exclude in checks):
+                        continue
+                    if socios_numsocio_list is not None and _raw_field(fields, numsocio_idx) not in socios_numsocio_list:
+                        continue
+
+                    row = dict(zip(header, fields))
+                    if len(fields) < width:
+                        for col in header[len(fields):]:
+                            row[col] = None
+                    elif len(fields) > width:
+                        row[None] = fields[width:]
+                    yield row
+
+            proc.stdout.close()
+            returncode = proc.wait()
+            finished = True
+            if returncode:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, proc.args, stderr=stderr_file.read().decode(errors='replace'))
+        finally:
+            if not finished:
+                # El consumidor abandonó el generador: cortar mdb-export
+                proc.stdout.close()
+                proc.kill()
+                proc.wait()
+
+def read_access_table(table_name, socios_numsocio_list=None):
+    """Leer tabla desde Access aplicando filtros si existen"""
+    return list(iter_access_table(table_name, socios_numsocio_list))
+
+# Cache por corrida: cada tabla de Access se exporta y parsea una sola vez,
+# aunque la pidan varios consumidores (filtro de comentarios, sync, verificación)
+_ACCESS_TABLE_CACHE = {}
+
+def access_table_cache_key(table_name, socios_numsocio_list=None):
+    """Clave de cache: nombre de tabla + conjunto de filtros aplicados"""
+    filters = tuple(sorted(TABLE_FILTERS.get(table_name, {}).items()))
+    socios = None
+    if table_name == 'TbComentariosSocios' and socios_numsocio_list:
+        socios = frozenset(socios_numsocio_list)
+    return (table_name, filters, socios)
+
+def get_access_table(table_name, socios_numsocio_list=None):
+    """Leer tabla desde Access reutilizando el export si ya se hizo en esta corrida"""
+    key = access_table_cache_key(table_name, socios_numsocio_list)
+    rows = _ACCESS_TABLE_CACHE.get(key)
+    if rows is None:
+        rows = read_access_table(table_name, socios_numsocio_list)
+        _ACCESS_TABLE_CACHE[key] = rows
+    return rows
+
+# Extracción en paralelo: cantidad máxima de mdb-export simultáneos
+EXTRACT_WORKERS = int(os.getenv('COBRANZA_EXTRACT_WORKERS', 4))
+
+# Dependencias de extracción y de sync: TbComentariosSocios se filtra con el NUMSOCIO de Socios
+TABLE_DEPENDENCIES = {
+    'TbComentariosSocios': 'Socios'
+}
+
+def get_socios_numsocio_list(socios_rows):
+    """NUMSOCIO de los socios filtrados (para filtrar TbComentariosSocios)"""
+    return set([access_text(row.get('NUMSOCIO')) for row in socios_rows if row.get('NUMSOCIO')])
+
+def extract_access_tables(tables, max_workers=EXTRACT_WORKERS):
+    """
+    Exportar tablas de Access en paralelo con un pool acotado de mdb-export.
+
+    Genera (tabla, filas, error) a medida que termina cada export, no en el orden
+    de `tables`. Las tablas con dependencia se lanzan recién cuando termina la
+    tabla de la que dependen. Las filas quedan en el cache de la corrida, así
+    get_access_table no vuelve a exportarlas.
+    """
+    socios_numsocio_list = None
+    waiting = [t for t in tables if TABLE_DEPENDENCIES.get(t) in tables]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit(table):
+            args = (table, socios_numsocio_list) if table in TABLE_DEPENDENCIES else (table,)
+            pending[executor.submit(read_access_table, *args)] = args
+
+        for table in tables:
+            if table not in waiting:
+                submit(table)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                args = pending.pop(future)
+                table = args[0]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    rows, error = None, e
+                else:
+                    error = None
+                    _ACCESS_TABLE_CACHE[access_table_cache_key(*args)] = rows
+                    if table == 'Socios':
+                        socios_numsocio_list = get_socios_numsocio_list(rows)
+
+                # Liberar las tablas que esperaban a esta
+                for dependent in [t for t in waiting if TABLE_DEPENDENCIES[t] == table]:
+                    waiting.remove(dependent)
+                    if error is None:
+                        submit(dependent)
+                    else:
+                        yield dependent, None, RuntimeError(f"falló la extracción de {table}: {error}")
+
+                yield table, rows, error
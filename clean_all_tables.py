@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 """
-Script para BORRAR todas las tablas y empezar desde cero
+Script para BORRAR todas las tablas y empezar desde cero.
+
+Las tablas no se eliminan: se renombran a `<tabla>__old` (un solo RENAME atómico
+por tabla), así se puede volver atrás. Las copias `__old` anteriores y las tablas
+sombra `__new` que hayan quedado de una carga cortada sí se eliminan.
 """
 import mysql.connector
 from dotenv import load_dotenv
 import os
+from mysql_writer import previous_table_name, shadow_table_name, table_exists
 
 load_dotenv()
 
@@ -42,11 +47,23 @@ cursor.execute("SET FOREIGN_KEY_CHECKS=0")
 
 for table in TABLES:
     try:
-        cursor.execute(f"DROP TABLE IF EXISTS `{table}`")
-        print(f"✅ {table} - BORRADA")
+        cursor.execute(f"DROP TABLE IF EXISTS `{shadow_table_name(table)}`")
+        if table_exists(cursor, table):
+            cursor.execute(f"DROP TABLE IF EXISTS `{previous_table_name(table)}`")
+            cursor.execute(f"RENAME TABLE `{table}` TO `{previous_table_name(table)}`")
+            print(f"✅ {table} - BORRADA (copia en {previous_table_name(table)})")
+        else:
+            print(f"✅ {table} - no existía")
     except Exception as e:
         print(f"❌ {table} - Error: {e}")
 
+# Fingerprints de sync_INCREMENTAL.py: sin tablas ya no describen nada
+try:
+    cursor.execute("DROP TABLE IF EXISTS `sync_fingerprints`")
+    print("✅ sync_fingerprints - BORRADA")
+except Exception as e:
+    print(f"❌ sync_fingerprints - Error: {e}")
+
 # Rehabilitar foreign keys
 cursor.execute("SET FOREIGN_KEY_CHECKS=1")
 
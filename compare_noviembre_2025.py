@@ -76,7 +76,7 @@ def read_mysql_liquidaciones_noviembre(conn):
         COBLIQUIDA,
         ZONLIQUIDA
     FROM Liquidaciones
-    WHERE YEAR(FECLIQUIDA) = 2025 AND MONTH(FECLIQUIDA) = 11
+    WHERE FECLIQUIDA >= '2025-11-01' AND FECLIQUIDA < '2025-12-01'  -- rango: usa ix_fecliquida
     ORDER BY FECLIQUIDA
     """
     
@@ -0,0 +1 @@
+# pytest: la raíz del repo en sys.path, así los tests importan los módulos (mdb_reader, ...) directo
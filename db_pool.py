@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Pool de conexiones MySQL por proceso (mysql.connector.pooling).
+
+Cada conexión al host remoto cuesta un handshake TCP + TLS + login; con el pool
+se abren una sola vez y se reutilizan. Al sacar una conexión, el pool la verifica
+con un ping y la reconecta si el servidor la cerró (ej. por wait_timeout).
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from mysql.connector import errors, pooling
+
+# Tamaño máximo que acepta mysql.connector.pooling
+POOL_MAX_SIZE = pooling.CNX_POOL_MAXSIZE
+
+# Segundos que se espera una conexión libre antes de fallar (pool agotado)
+POOL_TIMEOUT = float(os.getenv('COBRANZA_POOL_TIMEOUT', 10))
+
+def mysql_config(**overrides):
+    """Parámetros de conexión desde el entorno (COBRANZA_DB_*)"""
+    config = {
+        'host': os.getenv('COBRANZA_DB_HOST'),
+        'user': os.getenv('COBRANZA_DB_USER'),
+        'password': os.getenv('COBRANZA_DB_PASSWORD'),
+        'database': os.getenv('COBRANZA_DB_NAME'),
+        'port': int(os.getenv('COBRANZA_DB_PORT', 3306)),
+    }
+    config.update(overrides)
+    return config
+
+def create_pool(name, size, reset_session=True, **overrides):
+    """Crear un pool de `size` conexiones (se recorta a POOL_MAX_SIZE); se conectan todas ya"""
+    return pooling.MySQLConnectionPool(
+        pool_name=name,
+        pool_size=max(1, min(int(size), POOL_MAX_SIZE)),
+        pool_reset_session=reset_session,
+        **mysql_config(**overrides)
+    )
+
+def get_connection(pool, timeout=POOL_TIMEOUT):
+    """Sacar una conexión del pool; si están todas en uso, esperar hasta `timeout` segundos"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return pool.get_connection()
+        except errors.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+@contextmanager
+def pooled_connection(pool, timeout=POOL_TIMEOUT):
+    """with pooled_connection(pool) as conn: ... (al salir la conexión vuelve al pool)"""
+    conn = get_connection(pool, timeout)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def check_pool(pool, timeout=POOL_TIMEOUT):
+    """Health check: SELECT 1 con una conexión del pool. Retorna la latencia en ms"""
+    start = time.perf_counter()
+    with pooled_connection(pool, timeout) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+    return (time.perf_counter() - start) * 1000
@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+Escritura masiva en MySQL compartida por sync_ALL.py y sync_INCREMENTAL.py.
+
+Carga las filas ya transformadas con LOAD DATA LOCAL INFILE: se escriben como
+TSV a un named pipe (o a un archivo temporal si el sistema no tiene mkfifo)
+mientras MySQL las lee, así no se arma el SQL de cada fila ni se guarda todo el
+TSV en memoria. Si el servidor no permite local infile se vuelve a los INSERT
+en batches del script.
+"""
+
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+
+# Carga masiva: 'auto' (LOAD DATA y, si el servidor no lo permite, INSERT en batches) u 'off'
+LOAD_DATA_MODE = os.getenv('COBRANZA_LOAD_DATA', 'auto').strip().lower()
+
+# Único directorio desde el que el conector puede mandar archivos con LOAD DATA LOCAL
+LOAD_DATA_DIR = os.path.join(tempfile.gettempdir(), 'cobranza_load_data')
+
+# Se apaga en la corrida si el servidor rechaza local infile, para no reintentar en cada tabla
+_load_data_available = LOAD_DATA_MODE != 'off'
+
+# Errores de MySQL/conector que indican local infile deshabilitado
+# (ER_NOT_ALLOWED_COMMAND, CR_LOAD_DATA_LOCAL_INFILE_REJECTED, ER_CLIENT_LOCAL_FILES_DISABLED)
+LOCAL_INFILE_DISABLED_ERRNOS = (1148, 2068, 3948)
+
+def connection_options():
+    """Opciones extra de mysql.connector.connect para poder usar LOAD DATA LOCAL INFILE"""
+    if LOAD_DATA_MODE == 'off':
+        return {}
+    os.makedirs(LOAD_DATA_DIR, exist_ok=True)
+    return {'allow_local_infile_in_path': LOAD_DATA_DIR}
+
+def sync_connection_options():
+    """Opciones de las conexiones de sync: sin autocommit, los COMMIT los decide CommitPolicy"""
+    return {'autocommit': False, **connection_options()}
+
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+def encode_tsv_value(value):
+    """Valor → campo TSV de LOAD DATA (NULL = \\N; fechas YYYY-MM-DD HH:MM:SS)"""
+    if value is None:
+        return '\\N'
+    value_type = type(value)
+    if value_type is str:
+        return value.translate(_TSV_ESCAPES)
+    if value_type is bool:
+        return '1' if value else '0'
+    if value_type is datetime:
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if value_type is Decimal:
+        return format(value, 'f')  # sin notación científica (0E-4)
+    if value_type is bytes:
+        return value.decode('utf-8', 'replace').translate(_TSV_ESCAPES)
+    return str(value)
+
+def encode_tsv_line(values):
+    return ('\t'.join([encode_tsv_value(v) for v in values]) + '\n').encode('utf-8')
+
+def _write_tsv(path, rows, to_values, errors, cancel=None):
+    """Hilo escritor: una línea TSV por fila. Con named pipe bloquea hasta que MySQL abre el archivo"""
+    try:
+        with open(path, 'wb', buffering=1024 * 1024) as f:
+            for row in rows:
+                if cancel is not None and cancel.is_set():
+                    break
+                f.write(encode_tsv_line(to_values(row)))
+    except BrokenPipeError:
+        pass  # El lector cerró el pipe (LOAD DATA falló): el error lo reporta el cursor
+    except Exception as e:
+        errors.append(e)
+
+class LoadDataWarnings(Exception):
+    """LOAD DATA terminó con warnings: hubo filas truncadas, convertidas o descartadas"""
+
+# Warnings de LOAD DATA que se muestran en el log
+LOAD_DATA_WARNINGS_SHOWN = 3
+
+def load_data_infile(cursor, table_name, columns, rows, to_values):
+    """
+    LOAD DATA LOCAL INFILE de `rows` (cada una pasa por to_values → tupla en el
+    orden de `columns`). Retorna la cantidad de filas cargadas; si falla, lanza
+    la excepción del servidor.
+
+    Con LOCAL, MySQL trata los errores de datos como IGNORE (valores inválidos,
+    truncados o claves duplicadas quedan como warnings y la carga "funciona"):
+    si hay warnings se lanza LoadDataWarnings con las filas ya cargadas en la tabla.
+    """
+    os.makedirs(LOAD_DATA_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=f'{table_name}_', dir=LOAD_DATA_DIR)
+    path = os.path.join(work_dir, 'rows.tsv')
+    use_pipe = hasattr(os, 'mkfifo')
+    errors = []
+    cancel = threading.Event()
+    try:
+        if use_pipe:
+            os.mkfifo(path)
+            writer = threading.Thread(target=_write_tsv, args=(path, rows, to_values, errors, cancel), daemon=True)
+            writer.start()
+        else:
+            _write_tsv(path, rows, to_values, errors)
+            if errors:
+                raise errors[0]
+
+        col_list = ', '.join(f'`{col}`' for col in columns)
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({col_list})",
+                (path,)
+            )
+            loaded = cursor.rowcount
+            warnings = cursor.warning_count
+            if warnings:
+                cursor.execute(f"SHOW WARNINGS LIMIT {LOAD_DATA_WARNINGS_SHOWN}")
+                shown = '; '.join(f"{level} {code}: {message}" for level, code, message in cursor.fetchall())
+        finally:
+            if use_pipe and writer.is_alive():
+                # MySQL no llegó a abrir el pipe (o lo cerró antes): cortar al escritor y
+                # abrir el pipe del lado de lectura para destrabarlo, descartando lo que escriba
+                cancel.set()
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+                try:
+                    while writer.is_alive():
+                        try:
+                            if not os.read(fd, 1024 * 1024):
+                                writer.join(0.01)
+                        except BlockingIOError:
+                            writer.join(0.01)
+                finally:
+                    os.close(fd)
+            if use_pipe:
+                writer.join()
+        if errors:
+            # El escritor falló a mitad: MySQL cargó solo las filas anteriores
+            raise RuntimeError(f"falló la generación del TSV después de {loaded:,} filas: {errors[0]}")
+        if warnings:
+            raise LoadDataWarnings(f"LOAD DATA cargó {loaded:,} filas con {warnings:,} warnings ({shown})")
+        return loaded
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def bulk_load(cursor, table_name, columns, rows, to_values, fallback):
+    """
+    Cargar filas en una tabla recién creada: LOAD DATA si se puede, si no `fallback(rows)`
+    (los INSERT en batches del script). Retorna (insertados, método, segundos).
+    Si LOAD DATA deja warnings, la tabla se vacía y se carga con `fallback`, que
+    aísla las filas con error y las guarda en sync_rejects.
+    """
+    global _load_data_available
+    start = time.perf_counter()
+    if _load_data_available:
+        try:
+            loaded = load_data_infile(cursor, table_name, columns, rows, to_values)
+            return loaded, 'LOAD DATA', time.perf_counter() - start
+        except RuntimeError:
+            raise
+        except LoadDataWarnings as e:
+            # La tabla es nueva (nadie la lee todavía): se descarta lo cargado y se repite con INSERT
+            print(f"   ⚠️  {e}: se descarta y se usan INSERT en batches")
+            cursor.execute(f"TRUNCATE TABLE `{table_name}`")
+            start = time.perf_counter()
+        except Exception as e:
+            # LOAD DATA es una sola sentencia: si falla no queda nada cargado
+            print(f"   ⚠️  LOAD DATA falló ({e}), se usan INSERT en batches")
+            if getattr(e, 'errno', None) in LOCAL_INFILE_DISABLED_ERRNOS:
+                _load_data_available = False
+            start = time.perf_counter()
+    inserted = fallback(rows)
+    return inserted, 'INSERT', time.perf_counter() - start
+
+# 🧯 RECHAZOS: si un batch falla se parte en mitades hasta aislar las filas con error
+# (O(log n) round trips por fila mala en vez de reintentar el batch fila por fila).
+# Las filas rechazadas se guardan en sync_rejects con la tabla y el error
+REJECTS_TABLE = 'sync_rejects'
+
+# Errores que no son de una fila: se propagan sin partir el batch
+# (lock wait timeout y deadlock deshacen la transacción; 2006/2013/2055 = conexión perdida)
+NON_ROW_ERRNOS = (1205, 1213, 2006, 2013, 2055)
+
+def ensure_rejects_table(cursor):
+    """Crear sync_rejects (DDL: llamar antes de abrir la transacción de una tabla)"""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{REJECTS_TABLE}` (
+            `id` INT AUTO_INCREMENT PRIMARY KEY,
+            `table_name` VARCHAR(64) NOT NULL,
+            `row_hash` VARCHAR(64) NULL,
+            `error_text` TEXT NOT NULL,
+            `row_data` LONGTEXT NULL,
+            `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX `ix_table_created` (`table_name`, `created_at`),
+            UNIQUE KEY `ux_table_row_hash` (`table_name`, `row_hash`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    # sync_rejects de versiones anteriores: sin row_hash (los rechazos viejos quedan con NULL)
+    cursor.execute(f"SHOW COLUMNS FROM `{REJECTS_TABLE}` LIKE 'row_hash'")
+    if cursor.fetchone() is None:
+        cursor.execute(f"ALTER TABLE `{REJECTS_TABLE}` ADD COLUMN `row_hash` VARCHAR(64) NULL AFTER `table_name`, "
+                       f"ADD UNIQUE KEY `ux_table_row_hash` (`table_name`, `row_hash`)")
+
+def execute_bisect(cursor, sql, values, rejects):
+    """
+    executemany(sql, values); si falla, reintenta cada mitad por separado hasta aislar
+    las filas con error, que se agregan a `rejects` como (valores, error).
+    Retorna la cantidad de filas aplicadas.
+    """
+    if not values:
+        return 0
+    try:
+        if len(values) == 1:
+            cursor.execute(sql, values[0])
+        else:
+            cursor.executemany(sql, values)
+        return len(values)
+    except Exception as e:
+        if getattr(e, 'errno', None) in NON_ROW_ERRNOS:
+            raise
+        if len(values) == 1:
+            rejects.append((values[0], str(e)))
+            return 0
+    mid = len(values) // 2
+    return (execute_bisect(cursor, sql, values[:mid], rejects) +
+            execute_bisect(cursor, sql, values[mid:], rejects))
+
+def _reject_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def record_rejects(cursor, table_name, rejects, columns=None):
+    """
+    Guardar las filas rechazadas en sync_rejects, en la misma transacción que la tabla.
+    `columns` (opcional) nombra los valores en row_data; si incluye row_hash, una fila
+    rechazada de nuevo actualiza su registro en vez de duplicarlo. Retorna la cantidad guardada.
+    """
+    if not rejects:
+        return 0
+    print(f"   ⚠️  {len(rejects):,} filas rechazadas → {REJECTS_TABLE} (ej.: {rejects[0][1]})")
+    hash_idx = columns.index('row_hash') if columns and 'row_hash' in columns else None
+    params = []
+    for values, error in rejects:
+        row_hash = None
+        if columns and len(columns) == len(values):
+            row_data = {col: _reject_value(v) for col, v in zip(columns, values)}
+            if hash_idx is not None:
+                row_hash = values[hash_idx]
+        else:
+            row_data = [_reject_value(v) for v in values]
+        params.append((table_name, row_hash, error, json.dumps(row_data, ensure_ascii=False)))
+    try:
+        cursor.executemany(f"INSERT INTO `{REJECTS_TABLE}` (table_name, row_hash, error_text, row_data) "
+                           f"VALUES (%s, %s, %s, %s) "
+                           f"ON DUPLICATE KEY UPDATE error_text = VALUES(error_text), row_data = VALUES(row_data)",
+                           params)
+    except Exception as e:
+        print(f"   ⚠️  No se pudieron guardar los rechazos en {REJECTS_TABLE}: {e}")
+        return 0
+    return len(params)
+
+def forget_rejects(cursor, table_name, row_hashes=None, batch_size=1000):
+    """Borrar rechazos de la tabla de sync_rejects: los de esos row_hash, o todos (row_hashes=None)"""
+    if row_hashes is None:
+        cursor.execute(f"DELETE FROM `{REJECTS_TABLE}` WHERE table_name = %s", (table_name,))
+        return cursor.rowcount
+    row_hashes = list(row_hashes)
+    deleted = 0
+    for i in range(0, len(row_hashes), batch_size):
+        batch = row_hashes[i:i+batch_size]
+        cursor.execute(f"DELETE FROM `{REJECTS_TABLE}` WHERE table_name = %s "
+                       f"AND row_hash IN ({', '.join(['%s'] * len(batch))})", (table_name, *batch))
+        deleted += cursor.rowcount
+    return deleted
+
+def pending_rejects(cursor, table_name, row_hashes):
+    """
+    row_hash de Access (`row_hashes`) que MySQL ya rechazó en una sync anterior: esas filas se
+    saltan hasta que cambien (cambia su row_hash). Los rechazos cuya versión ya no está en
+    Access (la fila cambió o se borró) se borran de sync_rejects.
+    """
+    cursor.execute(f"SELECT row_hash FROM `{REJECTS_TABLE}` WHERE table_name = %s AND row_hash IS NOT NULL",
+                   (table_name,))
+    rejected = {row[0] for row in cursor.fetchall()}
+    if not rejected:
+        return rejected
+    stale = rejected.difference(row_hashes)
+    if stale:
+        forget_rejects(cursor, table_name, stale)
+    return rejected - stale
+
+# 📏 BATCHES ADAPTATIVOS: el tamaño de cada executemany se ajusta por tabla según lo que tarda
+# MySQL en responder. Arranca en COBRANZA_BATCH_SIZE filas, crece mientras los statements
+# tardan menos que la mitad de COBRANZA_BATCH_TARGET_MS y se achica cuando tardan más.
+# Además cada batch respeta un tope de bytes (COBRANZA_BATCH_BYTES y la mitad de max_allowed_packet)
+BATCH_START_ROWS = int(os.getenv('COBRANZA_BATCH_SIZE', 1000))
+BATCH_MIN_ROWS = 50
+BATCH_MAX_ROWS = 20000
+BATCH_MAX_BYTES = int(os.getenv('COBRANZA_BATCH_BYTES', 4 * 1024 * 1024))
+BATCH_TARGET_SECONDS = float(os.getenv('COBRANZA_BATCH_TARGET_MS', 1000)) / 1000
+
+# Bytes de SQL por valor además del dato (comillas, coma, escapes) y por fila (paréntesis)
+_SQL_VALUE_OVERHEAD = 4
+_SQL_ROW_OVERHEAD = 4
+
+_max_allowed_packet = None
+
+def get_max_allowed_packet(cursor):
+    """@@max_allowed_packet del servidor (se consulta una vez por corrida)"""
+    global _max_allowed_packet
+    if _max_allowed_packet is None:
+        cursor.execute("SELECT @@max_allowed_packet")
+        _max_allowed_packet = int(cursor.fetchone()[0])
+    return _max_allowed_packet
+
+def estimate_sql_bytes(values):
+    """Tamaño aproximado de una fila dentro del INSERT … VALUES multi-fila"""
+    return estimate_row_bytes(values) + _SQL_VALUE_OVERHEAD * len(values) + _SQL_ROW_OVERHEAD
+
+class AdaptiveBatcher:
+    """
+    Parte las escrituras de una tabla en batches por filas y por bytes, y ajusta la
+    cantidad de filas por batch con la latencia medida de cada statement.
+    """
+
+    def __init__(self, cursor, start_rows=None, max_bytes=None, target_seconds=None):
+        self.rows = max(BATCH_MIN_ROWS, min(start_rows or BATCH_START_ROWS, BATCH_MAX_ROWS))
+        self.max_bytes = min(max_bytes or BATCH_MAX_BYTES, get_max_allowed_packet(cursor) // 2)
+        self.target_seconds = target_seconds or BATCH_TARGET_SECONDS
+        self.statements = 0
+
+    def split(self, values):
+        """Batches consecutivos de `values` de hasta self.rows filas y self.max_bytes bytes"""
+        batch = []
+        batch_bytes = 0
+        for row_values in values:
+            row_bytes = estimate_sql_bytes(row_values)
+            if batch and (len(batch) >= self.rows or batch_bytes + row_bytes > self.max_bytes):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(row_values)
+            batch_bytes += row_bytes
+        if batch:
+            yield batch
+
+    def record(self, rows, seconds):
+        """Ajustar filas por batch con la latencia de un statement de `rows` filas"""
+        self.statements += 1
+        if seconds > self.target_seconds:
+            self.rows = max(BATCH_MIN_ROWS, int(self.rows * 0.5))
+        elif seconds < self.target_seconds / 2 and rows >= self.rows:
+            # Solo crece si el batch estaba lleno (no lo cortó el tope de bytes o el final)
+            self.rows = min(BATCH_MAX_ROWS, int(self.rows * 1.5))
+
+    def execute(self, cursor, sql, values, rejects):
+        """execute_bisect de `values` en batches adaptativos. Retorna las filas aplicadas"""
+        applied = 0
+        # El tamaño se decide batch por batch: split lee self.rows en cada corte
+        for batch in self.split(values):
+            start = time.perf_counter()
+            applied += execute_bisect(cursor, sql, batch, rejects)
+            self.record(len(batch), time.perf_counter() - start)
+        return applied
+
+# 💾 COMMITS: las conexiones de sync trabajan con autocommit=False y confirman según la política
+# 'table' (default): un COMMIT por tabla
+# 'rows': además, cada COBRANZA_COMMIT_ROWS filas; 'bytes': cada COBRANZA_COMMIT_BYTES bytes escritos
+# Los COMMIT intermedios solo se hacen al cargar una tabla sombra (`__new`), que nadie lee
+# hasta el RENAME; los cambios incrementales sobre la tabla en uso se confirman siempre juntos
+COMMIT_POLICY = os.getenv('COBRANZA_COMMIT_POLICY', 'table').strip().lower()
+COMMIT_ROWS = int(os.getenv('COBRANZA_COMMIT_ROWS', 50000))
+COMMIT_BYTES = int(os.getenv('COBRANZA_COMMIT_BYTES', 32 * 1024 * 1024))
+
+def estimate_row_bytes(values):
+    """Tamaño aproximado de una fila en la transacción (largo del texto; 8 bytes el resto)"""
+    return sum(len(v) if type(v) is str else 8 for v in values if v is not None)
+
+class CommitPolicy:
+    """
+    Transacción acotada de una tabla: add() suma lo escrito y hace COMMIT al pasar el
+    límite de la política; commit()/rollback() cierran la transacción al final de la tabla.
+    """
+
+    def __init__(self, conn, policy=None, max_rows=None, max_bytes=None):
+        self.conn = conn
+        self.policy = policy or COMMIT_POLICY
+        self.max_rows = max_rows or COMMIT_ROWS
+        self.max_bytes = max_bytes or COMMIT_BYTES
+        self.pending_rows = 0
+        self.pending_bytes = 0
+        self.commits = 0
+
+    def add(self, rows, nbytes=0):
+        """Registrar filas escritas; retorna True si se hizo COMMIT"""
+        self.pending_rows += rows
+        self.pending_bytes += nbytes
+        if ((self.policy == 'rows' and self.pending_rows >= self.max_rows) or
+                (self.policy == 'bytes' and self.pending_bytes >= self.max_bytes)):
+            self.commit()
+            return True
+        return False
+
+    def commit(self):
+        self.conn.commit()
+        self.commits += 1
+        self.pending_rows = 0
+        self.pending_bytes = 0
+
+    def rollback(self):
+        self.conn.rollback()
+        self.pending_rows = 0
+        self.pending_bytes = 0
+
+# 🚰 PIPELINE: extracción → transformación → carga en hilos unidos por colas acotadas.
+# La transformación (fechas, hash) de los batches siguientes corre mientras el hilo que
+# llama espera la respuesta de MySQL; las colas frenan al que va adelante (backpressure)
+PIPELINE_QUEUE_BATCHES = max(1, int(os.getenv('COBRANZA_PIPELINE_QUEUE', 4)))
+# Filas por batch del pipeline; load() las vuelve a partir con AdaptiveBatcher
+PIPELINE_BATCH_ROWS = 5000
+
+_PIPELINE_END = object()
+
+class _PipelineError:
+    def __init__(self, error):
+        self.error = error
+
+def _pipeline_put(q, item, cancel):
+    """put que se corta si el pipeline se canceló (así ningún hilo queda bloqueado)"""
+    while not cancel.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _pipeline_extract(rows, batch_size, outbox, cancel):
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                if not _pipeline_put(outbox, batch, cancel):
+                    return
+                batch = []
+        if batch and not _pipeline_put(outbox, batch, cancel):
+            return
+        _pipeline_put(outbox, _PIPELINE_END, cancel)
+    except Exception as e:
+        _pipeline_put(outbox, _PipelineError(e), cancel)
+
+def _pipeline_transform(transform, inbox, outbox, cancel):
+    while not cancel.is_set():
+        try:
+            batch = inbox.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if batch is _PIPELINE_END or isinstance(batch, _PipelineError):
+            _pipeline_put(outbox, batch, cancel)
+            return
+        try:
+            item = transform(batch)
+        except Exception as e:
+            item = _PipelineError(e)
+        if not _pipeline_put(outbox, item, cancel) or isinstance(item, _PipelineError):
+            return
+
+def run_pipeline(rows, transform, load, batch_size=PIPELINE_BATCH_ROWS, queue_batches=PIPELINE_QUEUE_BATCHES):
+    """
+    Extraer → transformar → cargar en batches de batch_size:
+    - rows: lista o iterador (ej. las filas de Access a medida que se leen)
+    - transform(filas) → lo que recibe load; corre en su propio hilo
+    - load(transformado) → cantidad cargada; corre en el hilo que llama (dueño de la conexión)
+    Cada cola guarda como mucho queue_batches batches. Retorna la suma de load().
+    """
+    cancel = threading.Event()
+    raw_batches = queue.Queue(maxsize=queue_batches)
+    ready_batches = queue.Queue(maxsize=queue_batches)
+    workers = [
+        threading.Thread(target=_pipeline_extract, args=(rows, batch_size, raw_batches, cancel), daemon=True),
+        threading.Thread(target=_pipeline_transform, args=(transform, raw_batches, ready_batches, cancel), daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
+    loaded = 0
+    try:
+        while True:
+            item = ready_batches.get()
+            if item is _PIPELINE_END:
+                break
+            if isinstance(item, _PipelineError):
+                raise item.error
+            loaded += load(item)
+    finally:
+        cancel.set()
+        for worker in workers:
+            worker.join()
+    return loaded
+
+def format_rate(count, seconds, method):
+    """'88,460 registros en 3.2s (27,643 reg/s, LOAD DATA)'"""
+    rate = count / seconds if seconds > 0 else 0
+    return f"{count:,} registros en {seconds:.1f}s ({rate:,.0f} reg/s, {method})"
+
+# Recargas sin tabla vacía: se construye `<tabla>__new`, se verifica y se publica con
+# un solo RENAME TABLE atómico. La versión anterior queda como `<tabla>__old` para rollback
+SHADOW_SUFFIX = '__new'
+PREVIOUS_SUFFIX = '__old'
+
+def shadow_table_name(table_name):
+    return f"{table_name}{SHADOW_SUFFIX}"
+
+def previous_table_name(table_name):
+    return f"{table_name}{PREVIOUS_SUFFIX}"
+
+def table_exists(cursor, table_name):
+    cursor.execute("SHOW TABLES LIKE %s", (table_name,))
+    return cursor.fetchone() is not None
+
+# 📇 ÍNDICES: además de la PK `id`, cada tabla declara sus índices como (nombre, columnas, único).
+# Las claves de negocio de get_unique_key_column van como UNIQUE; Socios no tiene clave única
+# (se sincroniza como multiconjunto) y solo lleva el índice de join con Liquidaciones/comentarios
+TABLE_INDEXES = {
+    'Cobradores': [('uq_numcob', ['NUMCOB'], True)],
+    'Socios': [('ix_numsocio', ['NUMSOCIO'], False)],
+    'Liquidaciones': [
+        ('uq_cupliquida', ['CUPLIQUIDA'], True),
+        ('ix_socliquida', ['SOCLIQUIDA'], False),
+        ('ix_fecliquida', ['FECLIQUIDA'], False),
+        ('ix_estliquida_fecliquida', ['ESTLIQUIDA', 'FECLIQUIDA'], False),  # consultas mensuales por estado
+    ],
+    'TblObras': [('uq_nunosocial', ['NUNOSOCIAL'], True)],
+    'TblPlanes': [('uq_numplan', ['NUMPLAN'], True)],
+    'TblFPagos': [('uq_numfpago', ['NUMFPAGO'], True)],
+    'TblIva': [('uq_cativa', ['CATIVA'], True)],
+    'TblZonas': [('uq_numzona', ['NUMZONA'], True)],
+    'TblPromotores': [('uq_numpromotor', ['NUMPROMOTOR'], True)],
+    'TbComentariosSocios': [('uq_idcomment', ['IdComment'], True), ('ix_numsocio', ['NUMSOCIO'], False)],
+}
+
+# Prefijo para indexar columnas TEXT/BLOB (MySQL no indexa el valor completo)
+INDEX_TEXT_PREFIX = 191
+
+# ER_DUP_ENTRY: los datos tienen duplicados para un UNIQUE
+DUPLICATE_ENTRY_ERRNO = 1062
+
+def _index_clause(name, columns, unique, col_types):
+    parts = []
+    for col in columns:
+        if col_types[col].startswith(('text', 'tinytext', 'mediumtext', 'longtext', 'blob')):
+            parts.append(f"`{col}`({INDEX_TEXT_PREFIX})")
+        else:
+            parts.append(f"`{col}`")
+    return f"ADD {'UNIQUE ' if unique else ''}INDEX `{name}` ({', '.join(parts)})"
+
+def ensure_indexes(cursor, table_name, target=None):
+    """
+    Crear los índices de TABLE_INDEXES[table_name] que falten en `target` (por defecto la
+    misma tabla; en recargas, la tabla sombra ya cargada). Se crean todos en un solo ALTER.
+    Si un UNIQUE choca con datos duplicados se crea como índice común y se avisa.
+    Retorna los nombres de los índices creados.
+    """
+    target = target or table_name
+    spec = TABLE_INDEXES.get(table_name, [])
+    if not spec:
+        return []
+
+    cursor.execute(f"SHOW INDEX FROM `{target}`")
+    existing = {row[2] for row in cursor.fetchall()}
+    cursor.execute(f"SHOW COLUMNS FROM `{target}`")
+    col_types = {row[0]: (row[1].decode() if isinstance(row[1], bytes) else row[1]).lower()
+                 for row in cursor.fetchall()}
+    # Las columnas que no vienen en los datos de Access no se indexan
+    missing = [(name, cols, unique) for name, cols, unique in spec
+               if name not in existing and all(col in col_types for col in cols)]
+    if not missing:
+        return []
+
+    try:
+        cursor.execute(f"ALTER TABLE `{target}` " +
+                       ', '.join(_index_clause(name, cols, unique, col_types) for name, cols, unique in missing))
+        return [name for name, _, _ in missing]
+    except Exception as e:
+        if getattr(e, 'errno', None) != DUPLICATE_ENTRY_ERRNO:
+            raise
+
+    # Algún UNIQUE tiene duplicados: índice por índice, degradando los UNIQUE que fallen
+    created = []
+    for name, cols, unique in missing:
+        try:
+            cursor.execute(f"ALTER TABLE `{target}` {_index_clause(name, cols, unique, col_types)}")
+        except Exception as e:
+            if not unique or getattr(e, 'errno', None) != DUPLICATE_ENTRY_ERRNO:
+                raise
+            print(f"   ⚠️  {table_name}: {', '.join(cols)} tiene duplicados, `{name}` se crea sin UNIQUE")
+            cursor.execute(f"ALTER TABLE `{target}` {_index_clause(name, cols, False, col_types)}")
+        created.append(name)
+    return created
+
+def publish_shadow_table(cursor, table_name, expected_rows):
+    """
+    Publicar `<tabla>__new` en lugar de `<tabla>` si tiene exactamente expected_rows filas.
+    La tabla anterior queda como `<tabla>__old`. Retorna las filas publicadas; si la
+    verificación falla, lanza RuntimeError y la tabla en uso queda intacta.
+    """
+    shadow = shadow_table_name(table_name)
+    previous = previous_table_name(table_name)
+
+    cursor.execute(f"SELECT COUNT(*) FROM `{shadow}`")
+    count = cursor.fetchone()[0]
+    if count != expected_rows:
+        raise RuntimeError(f"`{shadow}` tiene {count:,} filas y se esperaban {expected_rows:,}; "
+                           f"`{table_name}` no se reemplaza")
+
+    cursor.execute(f"DROP TABLE IF EXISTS `{previous}`")
+    if table_exists(cursor, table_name):
+        cursor.execute(f"RENAME TABLE `{table_name}` TO `{previous}`, `{shadow}` TO `{table_name}`")
+    else:
+        cursor.execute(f"RENAME TABLE `{shadow}` TO `{table_name}`")
+    return count
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+row_hash de las filas de Access, compartido por sync_ALL.py y sync_INCREMENTAL.py.
+
+sync_ALL.py escribe el row_hash de cada fila y sync_INCREMENTAL.py lo compara
+contra el de Access para detectar cambios: los dos tienen que calcularlo
+exactamente igual, así que el cálculo vive solo acá.
+"""
+
+import hashlib
+from access_reader import access_text
+
+# Digest de row_hash: blake2b de 16 bytes (32 caracteres hex).
+# Los SHA-256 de versiones anteriores (64 hex) se reconocen por el largo y se migran
+ROW_HASH_DIGEST_SIZE = 16
+LEGACY_ROW_HASH_LENGTH = 64
+
+def build_hash_plan(columns):
+    """Plan de hash de una tabla: orden de columnas fijo, calculado una sola vez"""
+    return tuple(sorted(columns))
+
+def _row_hash_content(row, hash_plan):
+    # Texto de mdb-export por celda: los valores tipados del lector nativo se pasan a texto
+    values = [row.get(col) for col in hash_plan]
+    return '|'.join([(value if type(value) is str else access_text(value)) or 'NULL' for value in values]).encode()
+
+def calculate_row_hash(row, hash_plan):
+    """Calcula hash de una fila para detectar cambios"""
+    return hashlib.blake2b(_row_hash_content(row, hash_plan), digest_size=ROW_HASH_DIGEST_SIZE).hexdigest()
+
+def calculate_legacy_row_hash(row, hash_plan):
+    """Hash SHA-256 de versiones anteriores: solo para reconocer row_hash viejos y migrarlos"""
+    return hashlib.sha256(_row_hash_content(row, hash_plan)).hexdigest()
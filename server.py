@@ -1,12 +1,30 @@
 import os
 import subprocess
+import threading
 from flask import Flask, jsonify
 from dotenv import load_dotenv
+from db_pool import POOL_MAX_SIZE, check_pool, create_pool, pooled_connection
 
 load_dotenv()
 
 app = Flask(__name__)
 
+# 🔌 Pool MySQL compartido por todos los endpoints: una conexión por hilo de waitress,
+# así ningún request espera conexión ni paga el handshake TLS con el host remoto.
+# El pool no pasa de POOL_MAX_SIZE: los hilos se recortan igual para no esperar conexión
+SERVER_THREADS = max(1, min(int(os.getenv('COBRANZA_SERVER_THREADS', 4)), POOL_MAX_SIZE))
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Pool del proceso: se crea al arrancar (o en el primer uso si MySQL no respondía)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool('cobranza_server', SERVER_THREADS)
+    return _pool
+
 @app.route("/")
 def index():
     return jsonify({
@@ -15,7 +33,8 @@ def index():
         "endpoints": {
             "/run/sync_all": "Sincronizacion completa (primera vez)",
             "/run/sync_incremental": "Sincronizacion incremental (diaria)",
-            "/run/clean": "Limpiar todas las tablas"
+            "/run/clean": "Limpiar todas las tablas",
+            "/health/db": "Verificar conexion a MySQL (pool)"
         }
     })
 
@@ -56,18 +75,11 @@ def clean_tables():
 @app.route("/run/create_mensajes_table")
 def create_mensajes_table():
     """Crear tabla MensajesEnviados para n8n"""
-    import mysql.connector
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('COBRANZA_DB_HOST'),
-            user=os.getenv('COBRANZA_DB_USER'),
-            password=os.getenv('COBRANZA_DB_PASSWORD'),
-            database=os.getenv('COBRANZA_DB_NAME'),
-            port=int(os.getenv('COBRANZA_DB_PORT', 3306))
-        )
-        cursor = conn.cursor()
+        with pooled_connection(get_pool()) as conn:
+            cursor = conn.cursor()
 
-        sql = '''
+            sql = '''
 CREATE TABLE IF NOT EXISTS MensajesEnviados (
   id INT AUTO_INCREMENT PRIMARY KEY,
   NUMSOCIO VARCHAR(13) NOT NULL,
@@ -85,14 +97,13 @@ CREATE TABLE IF NOT EXISTS MensajesEnviados (
   INDEX idx_hash (hash_mensaje)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
 '''
-        cursor.execute(sql)
-        conn.commit()
+            cursor.execute(sql)
+            conn.commit()
 
-        cursor.execute('DESCRIBE MensajesEnviados')
-        columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
+            cursor.execute('DESCRIBE MensajesEnviados')
+            columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return jsonify({"status": "ok", "message": "Tabla MensajesEnviados creada", "columns": columns})
     except Exception as e:
@@ -101,30 +112,22 @@ CREATE TABLE IF NOT EXISTS MensajesEnviados (
 @app.route("/run/add_errormessage_column")
 def add_errormessage_column():
     """Agregar columna errormessage a tabla MensajesEnviados"""
-    import mysql.connector
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('COBRANZA_DB_HOST'),
-            user=os.getenv('COBRANZA_DB_USER'),
-            password=os.getenv('COBRANZA_DB_PASSWORD'),
-            database=os.getenv('COBRANZA_DB_NAME'),
-            port=int(os.getenv('COBRANZA_DB_PORT', 3306))
-        )
-        cursor = conn.cursor()
+        with pooled_connection(get_pool()) as conn:
+            cursor = conn.cursor()
 
-        # Agregar columna errormessage si no existe
-        sql = '''
+            # Agregar columna errormessage si no existe
+            sql = '''
 ALTER TABLE MensajesEnviados
 ADD COLUMN IF NOT EXISTS errormessage TEXT NULL AFTER respuesta_api
 '''
-        cursor.execute(sql)
-        conn.commit()
+            cursor.execute(sql)
+            conn.commit()
 
-        cursor.execute('DESCRIBE MensajesEnviados')
-        columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
+            cursor.execute('DESCRIBE MensajesEnviados')
+            columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return jsonify({"status": "ok", "message": "Columna errormessage agregada", "columns": columns})
     except Exception as e:
@@ -133,18 +136,11 @@ ADD COLUMN IF NOT EXISTS errormessage TEXT NULL AFTER respuesta_api
 @app.route("/run/create_ia_usage_table")
 def create_ia_usage_table():
     """Crear tabla IAUsageLogs para tracking de uso de IA"""
-    import mysql.connector
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('COBRANZA_DB_HOST'),
-            user=os.getenv('COBRANZA_DB_USER'),
-            password=os.getenv('COBRANZA_DB_PASSWORD'),
-            database=os.getenv('COBRANZA_DB_NAME'),
-            port=int(os.getenv('COBRANZA_DB_PORT', 3306))
-        )
-        cursor = conn.cursor()
+        with pooled_connection(get_pool()) as conn:
+            cursor = conn.cursor()
 
-        sql = '''
+            sql = '''
 CREATE TABLE IF NOT EXISTS IAUsageLogs (
   id INT AUTO_INCREMENT PRIMARY KEY,
   workflow_id VARCHAR(50),
@@ -163,14 +159,13 @@ CREATE TABLE IF NOT EXISTS IAUsageLogs (
   INDEX idx_status (status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
 '''
-        cursor.execute(sql)
-        conn.commit()
+            cursor.execute(sql)
+            conn.commit()
 
-        cursor.execute('DESCRIBE IAUsageLogs')
-        columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
+            cursor.execute('DESCRIBE IAUsageLogs')
+            columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return jsonify({"status": "ok", "message": "Tabla IAUsageLogs creada", "columns": columns})
     except Exception as e:
@@ -179,18 +174,11 @@ CREATE TABLE IF NOT EXISTS IAUsageLogs (
 @app.route("/run/create_conversaciones_table")
 def create_conversaciones_table():
     """Crear tabla Conversaciones para almacenar historial de chats completos"""
-    import mysql.connector
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('COBRANZA_DB_HOST'),
-            user=os.getenv('COBRANZA_DB_USER'),
-            password=os.getenv('COBRANZA_DB_PASSWORD'),
-            database=os.getenv('COBRANZA_DB_NAME'),
-            port=int(os.getenv('COBRANZA_DB_PORT', 3306))
-        )
-        cursor = conn.cursor()
+        with pooled_connection(get_pool()) as conn:
+            cursor = conn.cursor()
 
-        sql = '''
+            sql = '''
 CREATE TABLE IF NOT EXISTS Conversaciones (
   id INT AUTO_INCREMENT PRIMARY KEY,
   telefono VARCHAR(30) NOT NULL,
@@ -210,19 +198,27 @@ CREATE TABLE IF NOT EXISTS Conversaciones (
   INDEX idx_conversacion (conversacion_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
 '''
-        cursor.execute(sql)
-        conn.commit()
+            cursor.execute(sql)
+            conn.commit()
 
-        cursor.execute('DESCRIBE Conversaciones')
-        columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
+            cursor.execute('DESCRIBE Conversaciones')
+            columns = [{'field': row[0], 'type': row[1]} for row in cursor.fetchall()]
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return jsonify({"status": "ok", "message": "Tabla Conversaciones creada", "columns": columns})
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@app.route("/health/db")
+def health_db():
+    """Health check del pool MySQL: SELECT 1 con una conexión del pool"""
+    try:
+        latency_ms = check_pool(get_pool())
+        return jsonify({"status": "ok", "pool_size": get_pool().pool_size, "latency_ms": round(latency_ms, 1)})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 503
+
 @app.route("/debug/file")
 def debug_file():
     import os
@@ -244,5 +240,10 @@ def debug_file():
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
+    # Abrir el pool antes de atender requests; si MySQL no responde, el server arranca igual
+    try:
+        print(f"Pool MySQL: {get_pool().pool_size} conexiones, SELECT 1 en {check_pool(get_pool()):.0f} ms")
+    except Exception as e:
+        print(f"Pool MySQL no disponible al arrancar ({e}), se reintenta en el primer request")
     from waitress import serve
-    serve(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    serve(app, host="0.0.0.0", port=port, threads=SERVER_THREADS)
\ No newline at end of file
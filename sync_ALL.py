@@ -6,15 +6,18 @@ load_dotenv()
 
 import os
 import subprocess
-import csv
 import re
-from io import StringIO
+import json
+import threading
 import mysql.connector
-from collections import OrderedDict
-import hashlib
-from datetime import datetime
-
-ACCESS_DB = os.getenv('COBRANZA_ACCESS_PATH', '/Users/nahuel/Documents/Desarrollos/P_M_Cobranza/BBDD/Datos1.mdb')
+from collections import OrderedDict, namedtuple
+from access_reader import ACCESS_DB, TABLE_DEPENDENCIES, extract_access_tables, get_access_table, get_socios_numsocio_list
+from mysql_writer import (COMMIT_POLICY, AdaptiveBatcher, CommitPolicy, bulk_load, ensure_indexes,
+                          ensure_rejects_table, estimate_row_bytes, forget_rejects, format_rate,
+                          publish_shadow_table, record_rejects, run_pipeline, shadow_table_name, sync_connection_options)
+from table_plan import build_table_plan
+from db_pool import create_pool, mysql_config, pooled_connection
+from table_scheduler import run_table_syncs
 
 # Lista de tablas principales a sincronizar
 TABLES = [
@@ -29,72 +32,109 @@ TABLES = [
     'TblPromotores',   # SIN FILTRO (todas)
     'TbComentariosSocios'  # FILTRADO: Indirecto via socios del cobrador 30
 ]
-
-# 🔥 FILTROS: Solo cobrador 30 y relacionados
-TABLE_FILTERS = {
-    'Cobradores': {
-        'NUMCOB': '30'          # Solo cobrador 30
-    },
-    'Socios': {
-        'COBSOCIO': '30'        # Solo socios del cobrador 30
-    },
-    'Liquidaciones': {
-        'COBLIQUIDA': '30',     # Solo liquidaciones del cobrador 30
-        'BAJA': '1'             # Excluir liquidaciones dadas de baja (BAJA=1)
-    }
-}
+# Los filtros de cada tabla (TABLE_FILTERS) están en access_reader.py
 
 def get_mysql_connection():
     """Conectar a MySQL"""
-    config = {
-        'host': os.getenv('COBRANZA_DB_HOST'),
-        'user': os.getenv('COBRANZA_DB_USER'),
-        'password': os.getenv('COBRANZA_DB_PASSWORD'),
-        'database': os.getenv('COBRANZA_DB_NAME'),
-        'port': int(os.getenv('COBRANZA_DB_PORT', 3306)),
-        'autocommit': True
-    }
-    return mysql.connector.connect(**config)
-
-def get_access_schema(table_name):
-    """Obtener esquema real de tabla desde Access usando mdb-schema"""
-    result = subprocess.run(
-        ['mdb-schema', ACCESS_DB, 'mysql'],
-        capture_output=True,
-        text=True,
-        check=True
-    )
-
-    # Buscar la definición de la tabla específica
-    schema_text = result.stdout
-
-    # Regex para encontrar CREATE TABLE específico
-    pattern = rf'CREATE TABLE `{table_name}`\s*\(\s*(.*?)\);'
-    match = re.search(pattern, schema_text, re.DOTALL | re.IGNORECASE)
-
-    if not match:
-        return None
-
-    columns_text = match.group(1)
-    columns = {}
-
-    # Parsear cada línea de columna
-    for line in columns_text.split('\n'):
-        line = line.strip().rstrip(',')
-        if not line or line.startswith('--'):
-            continue
+    return mysql.connector.connect(**mysql_config(**sync_connection_options()))
+
+# Registro de esquema: mdb-schema se corre una sola vez por corrida y se
+# guarda en disco por versión del archivo (tamaño + mtime) para las siguientes
+SCHEMA_CACHE_PATH = os.getenv(
+    'COBRANZA_SCHEMA_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.schema_cache.json')
+)
+
+# Metadata tipada de cada columna del esquema de Access
+SchemaColumn = namedtuple('SchemaColumn', ['name', 'access_type', 'mysql_type', 'not_null'])
+
+_ACCESS_SCHEMA = None
+_ACCESS_SCHEMA_LOCK = threading.Lock()
+
+def parse_access_schema(schema_text):
+    """Parsear todos los CREATE TABLE de mdb-schema: {tabla: OrderedDict(columna -> SchemaColumn)}"""
+    tables = {}
+    for match in re.finditer(r'CREATE TABLE `([^`]+)`\s*\(\s*(.*?)\);', schema_text, re.DOTALL | re.IGNORECASE):
+        table_name, columns_text = match.group(1), match.group(2)
+        columns = OrderedDict()
+
+        # Parsear cada línea de columna
+        for line in columns_text.split('\n'):
+            line = line.strip().rstrip(',')
+            if not line or line.startswith('--'):
+                continue
 
-        # Extraer nombre y tipo: `COLUMNA` tipo
-        col_match = re.match(r'`(\w+)`\s+(.+)', line)
-        if col_match:
-            col_name = col_match.group(1)
-            col_type_raw = col_match.group(2).strip()
+            # Extraer nombre y tipo: `COLUMNA` tipo
+            col_match = re.match(r'`(\w+)`\s+(.+)', line)
+            if col_match:
+                col_name = col_match.group(1)
+                col_type_raw = col_match.group(2).strip()
+                columns[col_name] = SchemaColumn(
+                    name=col_name,
+                    access_type=col_type_raw,
+                    # Convertir tipos de Access/mdb-schema a MySQL compatibles
+                    mysql_type=convert_access_type_to_mysql(col_type_raw),
+                    not_null='not null' in col_type_raw.lower()
+                )
+
+        tables[table_name] = columns
+    return tables
+
+def _access_file_version(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def load_access_schema():
+    """Esquema completo de Access: una sola corrida de mdb-schema por versión del archivo"""
+    global _ACCESS_SCHEMA
+    if _ACCESS_SCHEMA is not None:
+        return _ACCESS_SCHEMA
+
+    # Las tablas se sincronizan en paralelo: un solo hilo corre mdb-schema
+    with _ACCESS_SCHEMA_LOCK:
+        if _ACCESS_SCHEMA is not None:
+            return _ACCESS_SCHEMA
+
+        version = _access_file_version(ACCESS_DB)
+        try:
+            with open(SCHEMA_CACHE_PATH, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == version:
+                _ACCESS_SCHEMA = {
+                    table: OrderedDict((col[0], SchemaColumn(*col)) for col in columns)
+                    for table, columns in cached['tables'].items()
+                }
+                return _ACCESS_SCHEMA
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # Sin cache o cache inválido: se regenera
+
+        result = subprocess.run(
+            ['mdb-schema', ACCESS_DB, 'mysql'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        _ACCESS_SCHEMA = parse_access_schema(result.stdout)
 
-            # Convertir tipos de Access/mdb-schema a MySQL compatibles
-            col_type = convert_access_type_to_mysql(col_type_raw)
-            columns[col_name] = col_type
+        try:
+            tmp_path = SCHEMA_CACHE_PATH + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': version,
+                    'tables': {table: [list(col) for col in columns.values()] for table, columns in _ACCESS_SCHEMA.items()}
+                }, f)
+            os.replace(tmp_path, SCHEMA_CACHE_PATH)
+        except OSError as e:
+            print(f"   ⚠️  No se pudo guardar el cache de esquema: {e}")
+
+        return _ACCESS_SCHEMA
 
-    return columns
+def get_access_schema(table_name):
+    """Obtener esquema real de tabla desde Access ({columna: tipo MySQL}), desde el registro"""
+    columns = load_access_schema().get(table_name)
+    if columns is None:
+        return None
+    return {col.name: col.mysql_type for col in columns.values()}
 
 def convert_access_type_to_mysql(access_type):
     """Convertir tipo de mdb-schema a tipo MySQL válido"""
@@ -125,35 +165,8 @@ def convert_access_type_to_mysql(access_type):
     else:
         return 'VARCHAR(255)'  # Default
 
-def read_access_table(table_name, socios_numsocio_list=None):
-    """Leer tabla desde Access aplicando filtros si existen"""
-    result = subprocess.run(
-        ['mdb-export', ACCESS_DB, table_name],
-        capture_output=True,
-        text=True,
-        check=True
-    )
-    reader = csv.DictReader(StringIO(result.stdout))
-    rows = list(reader)
-
-    # Aplicar filtros en Python si existen para esta tabla
-    if table_name in TABLE_FILTERS:
-        filters = TABLE_FILTERS[table_name]
-
-        # Filtro genérico: Para cada clave en filters
-        for field, value in filters.items():
-            if field == 'BAJA':
-                # BAJA: excluir si BAJA=value (normalmente '1')
-                rows = [row for row in rows if row.get(field) != value]
-            else:
-                # Otros campos: incluir solo si campo=value
-                rows = [row for row in rows if row.get(field) == value]
-
-    # Filtro especial para TbComentariosSocios: solo comentarios de socios filtrados
-    if table_name == 'TbComentariosSocios' and socios_numsocio_list:
-        rows = [row for row in rows if row.get('NUMSOCIO') in socios_numsocio_list]
-
-    return rows
+# Tablas que se cargan a la vez, cada una con su conexión (1 = una tras otra)
+SYNC_WORKERS = max(1, int(os.getenv('COBRANZA_SYNC_WORKERS', 3)))
 
 def get_all_columns(rows):
     """Obtener todas las columnas únicas de todos los registros"""
@@ -164,32 +177,6 @@ def get_all_columns(rows):
                 all_cols[col] = True
     return list(all_cols.keys())
 
-def convert_date_value(value):
-    """Convertir fechas de formato Access a formato MySQL"""
-    if not value or value == '':
-        return None
-
-    try:
-        # Access exporta fechas como: "01/27/22 00:00:00"
-        for fmt in ['%m/%d/%y %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%m/%d/%y', '%m/%d/%Y']:
-            try:
-                dt = datetime.strptime(value, fmt)
-                return dt.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                continue
-        return None
-    except:
-        return None
-
-def calculate_row_hash(row, columns):
-    """Calcular hash SHA-256 de una fila"""
-    values = []
-    for col in sorted(columns):
-        val = row.get(col, '')
-        values.append(str(val) if val else 'NULL')
-    content = '|'.join(values)
-    return hashlib.sha256(content.encode()).hexdigest()
-
 def is_date_column(col_type):
     """Verificar si el tipo es fecha/datetime"""
     return col_type.upper() in ['DATE', 'DATETIME']
@@ -212,7 +199,7 @@ def sync_table(table_name, conn, cursor, socios_numsocio_list=None):
     # 2. Leer datos desde Access
     print(f"2. Leyendo datos desde Access...")
     try:
-        rows = read_access_table(table_name, socios_numsocio_list)
+        rows = get_access_table(table_name, socios_numsocio_list)
         if not rows:
             print(f"   ⚠️  Tabla vacía, saltando...")
             return
@@ -225,11 +212,12 @@ def sync_table(table_name, conn, cursor, socios_numsocio_list=None):
     all_cols = get_all_columns(rows)
     print(f"   ✅ {len(all_cols)} columnas en datos")
 
-    # 4. Crear tabla
-    print(f"3. Creando/recreando tabla en MySQL...")
+    # 4. Crear tabla sombra: la tabla en uso sigue intacta hasta el RENAME final
+    shadow = shadow_table_name(table_name)
+    print(f"3. Creando tabla {shadow} en MySQL...")
     try:
         cursor.execute("SET FOREIGN_KEY_CHECKS=0")
-        cursor.execute(f"DROP TABLE IF EXISTS `{table_name}`")
+        cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
 
         col_defs = ["`id` INT AUTO_INCREMENT PRIMARY KEY"]
         for col in all_cols:
@@ -244,7 +232,7 @@ def sync_table(table_name, conn, cursor, socios_numsocio_list=None):
         col_defs.append("`updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
 
         create_sql = f"""
-        CREATE TABLE `{table_name}` (
+        CREATE TABLE `{shadow}` (
             {', '.join(col_defs)}
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
         """
@@ -261,108 +249,151 @@ def sync_table(table_name, conn, cursor, socios_numsocio_list=None):
     cursor.execute("SET FOREIGN_KEY_CHECKS=0")
     cursor.execute("SET UNIQUE_CHECKS=0")
 
-    batch_size = 1000
-    inserted = 0
-
-    placeholders = ', '.join(['%s'] * (len(all_cols) + 1))
-    col_names = ', '.join([f'`{col}`' for col in all_cols]) + ', `row_hash`'
-    insert_sql = f"INSERT INTO `{table_name}` ({col_names}) VALUES ({placeholders})"
-
     # Determinar columnas de fecha basándonos en el esquema
     date_columns = set()
     if schema:
         for col, col_type in schema.items():
             if is_date_column(col_type):
                 date_columns.add(col)
-
-    for i in range(0, len(rows), batch_size):
-        batch = rows[i:i+batch_size]
-
-        if i > 0 and i % 10000 == 0:
-            print(f"   ... {inserted:,} / {len(rows):,}")
-
-        values = []
-        for row in batch:
-            row_hash = calculate_row_hash(row, all_cols)
-            row_values = []
-            for col in all_cols:
-                val = row.get(col) if row.get(col) else None
-                # Convertir fechas si la columna es de tipo fecha
-                if val and col in date_columns:
-                    val = convert_date_value(val)
-                row_values.append(val)
-            values.append(tuple(row_values) + (row_hash,))
-
-        try:
-            cursor.executemany(insert_sql, values)
-            inserted += len(batch)
-        except Exception as e:
-            print(f"   ⚠️ Error en batch: {e}")
-            # Intentar uno por uno si falla el batch
-            for row in batch:
-                try:
-                    row_hash = calculate_row_hash(row, all_cols)
-                    row_values = []
-                    for col in all_cols:
-                        val = row.get(col) if row.get(col) else None
-                        if val and col in date_columns:
-                            val = convert_date_value(val)
-                        row_values.append(val)
-                    cursor.execute(insert_sql, tuple(row_values) + (row_hash,))
-                    inserted += 1
-                except Exception as row_err:
-                    if inserted == 0:
-                        print(f"   ⚠️ Error en registro: {row_err}")
-                        print(f"      Columnas: {all_cols}")
-                        print(f"      Valores: {row_values[:5]}...")
+    # Mismo plan que sync_INCREMENTAL.py (table_plan.py): un converter por columna elegido una
+    # sola vez (fechas con formato detectado y valores memoizados, el resto '' → NULL) y el row_hash
+    plan = build_table_plan(table_name, all_cols, date_columns)
+    insert_sql = plan.insert_sql(shadow)
+
+    # Transacciones acotadas: la tabla sombra no la lee nadie hasta el RENAME
+    commit_policy = CommitPolicy(conn)
+
+    # Filas que MySQL rechaza: se aíslan partiendo el batch y van a sync_rejects
+    rejects = []
+
+    def insert_batches(rows):
+        # Pipeline: los valores (fechas + hash) de los próximos batches se arman en otro hilo
+        # mientras este espera a MySQL
+        progress = {'inserted': 0, 'next_report': 10000}
+        batcher = AdaptiveBatcher(cursor)
+
+        def transform(batch):
+            return plan.rows_values(batch)
+
+        def load(values):
+            applied = batcher.execute(cursor, insert_sql, values, rejects)
+            commit_policy.add(applied, sum(estimate_row_bytes(v) for v in values))
+            progress['inserted'] += applied
+            if progress['inserted'] >= progress['next_report']:
+                print(f"   ... {progress['inserted']:,} / {len(rows):,}")
+                progress['next_report'] += 10000
+            return applied
+
+        inserted = run_pipeline(rows, transform, load)
+        print(f"   📏 {batcher.statements:,} INSERT, batch final de {batcher.rows:,} filas")
+        return inserted
+
+    # LOAD DATA LOCAL INFILE (TSV en streaming); si el servidor no lo permite, INSERT en batches
+    try:
+        # Carga completa: se reintentan todas las filas, incluso las rechazadas antes (los
+        # rechazos de esta carga se vuelven a registrar y se confirman junto con la tabla)
+        forget_rejects(cursor, table_name)
+        inserted, method, seconds = bulk_load(cursor, shadow, plan.write_columns, rows,
+                                              plan.row_values, insert_batches)
+        print(f"   ⏱️  {format_rate(inserted, seconds, method)}")
+        record_rejects(cursor, table_name, rejects, plan.write_columns)
+        commit_policy.commit()
+        if commit_policy.commits > 1:
+            print(f"   💾 {commit_policy.commits:,} commits ({COMMIT_POLICY})")
+    except Exception as e:
+        commit_policy.rollback()
+        print(f"   ❌ Error en carga masiva: {e}")
 
     cursor.execute("SET FOREIGN_KEY_CHECKS=1")
     cursor.execute("SET UNIQUE_CHECKS=1")
 
-    # 6. Verificar
-    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-    final_count = cursor.fetchone()[0]
+    # 6. Índices (claves de negocio y columnas de filtro) con la tabla ya cargada:
+    # armarlos una vez al final es mucho más barato que mantenerlos fila por fila
+    try:
+        created = ensure_indexes(cursor, table_name, shadow)
+        if created:
+            print(f"   📇 Índices: {', '.join(created)}")
+    except Exception as e:
+        print(f"   ⚠️  Error creando índices: {e}")
+
+    # 7. Verificar filas y publicar con un RENAME atómico (la versión anterior queda en __old)
+    try:
+        final_count = publish_shadow_table(cursor, table_name, len(rows) - len(rejects))
+    except Exception as e:
+        print(f"   ❌ No se publica la tabla: {e}")
+        return
 
     print(f"   ✅ COMPLETADO: {final_count:,} registros en MySQL")
 
-# MAIN
-print("="*80)
-print("SINCRONIZACIÓN COMPLETA - COBRADOR 30")
-print("="*80)
+def main():
+    print("="*80)
+    print("SINCRONIZACIÓN COMPLETA - COBRADOR 30")
+    print("="*80)
 
-conn = get_mysql_connection()
-cursor = conn.cursor()
+    conn = get_mysql_connection()
+    cursor = conn.cursor()
 
-results = {}
-socios_numsocio_list = None
+    results = {}
+    socios_numsocio_list = None
 
-for table in TABLES:
-    try:
-        # Capturar NUMSOCIO de Socios para filtrar TbComentariosSocios
+    # La carga completa invalida los fingerprints de sync_INCREMENTAL.py
+    cursor.execute("DROP TABLE IF EXISTS `sync_fingerprints`")
+    ensure_rejects_table(cursor)
+    conn.commit()
+
+    def sync_one(table, extracted_rows, extract_error):
+        """Carga de una tabla con su propia conexión del pool (corre en un hilo del scheduler)"""
+        nonlocal socios_numsocio_list
+        if extract_error is not None:
+            raise extract_error
+
+        # Capturar NUMSOCIO de Socios para filtrar TbComentariosSocios (que espera a Socios)
         if table == 'Socios':
-            socios_rows = read_access_table('Socios')
-            socios_numsocio_list = set([row.get('NUMSOCIO') for row in socios_rows if row.get('NUMSOCIO')])
+            socios_numsocio_list = get_socios_numsocio_list(extracted_rows)
             print(f"\n📋 Capturados {len(socios_numsocio_list)} NUMSOCIO de Socios para filtrar comentarios\n")
 
-        sync_table(table, conn, cursor, socios_numsocio_list)
-        cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
-        count = cursor.fetchone()[0]
-        results[table] = count
-    except Exception as e:
-        print(f"\n❌ Error en {table}: {e}")
-        results[table] = 0
-
-cursor.close()
-conn.close()
-
-# RESUMEN FINAL
-print("\n" + "="*80)
-print("RESUMEN FINAL")
-print("="*80)
-total = 0
-for table, count in results.items():
-    print(f"{table:30s}: {count:>10,} registros")
-    total += count
-print("-"*80)
-print(f"{'TOTAL':30s}: {total:>10,} registros")
-print("="*80)
+        with pooled_connection(sync_pool) as table_conn:
+            table_cursor = table_conn.cursor()
+            try:
+                sync_table(table, table_conn, table_cursor, socios_numsocio_list)
+                table_cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+                count = table_cursor.fetchone()[0]
+                table_conn.commit()
+                return count
+            except Exception:
+                table_conn.rollback()
+                raise
+            finally:
+                table_cursor.close()
+
+    # Una conexión por tabla en paralelo (COBRANZA_SYNC_WORKERS)
+    sync_pool = create_pool('cobranza_sync', SYNC_WORKERS, **sync_connection_options())
+    print(f"\n🔀 Cargando hasta {SYNC_WORKERS} tablas en paralelo")
+
+    # Las tablas se cargan a medida que termina su export (en paralelo) y sus dependencias
+    for table, count, error in run_table_syncs(TABLES, extract_access_tables(TABLES), sync_one,
+                                               TABLE_DEPENDENCIES, SYNC_WORKERS):
+        if error is not None:
+            print(f"\n❌ Error en {table}: {error}")
+            results[table] = 0
+        else:
+            results[table] = count
+
+    cursor.close()
+    conn.close()
+
+    # RESUMEN FINAL
+    print("\n" + "="*80)
+    print("RESUMEN FINAL")
+    print("="*80)
+    total = 0
+    for table in TABLES:
+        count = results.get(table, 0)
+        print(f"{table:30s}: {count:>10,} registros")
+        total += count
+    print("-"*80)
+    print(f"{'TOTAL':30s}: {total:>10,} registros")
+    print("="*80)
+
+if __name__ == '__main__':
+    main()
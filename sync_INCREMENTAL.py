@@ -5,15 +5,29 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-import subprocess
-import csv
-from io import StringIO
+import mmap
+import sqlite3
 import mysql.connector
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import hashlib
-from datetime import datetime
+import json
+import zlib
+from access_dates import ISO_DATES
+from row_hash import LEGACY_ROW_HASH_LENGTH, ROW_HASH_DIGEST_SIZE, calculate_legacy_row_hash
+from access_reader import (ACCESS_DB, ACCESS_READER, TABLE_DEPENDENCIES, TABLE_FILTERS, access_text,
+                           extract_access_tables, get_access_table, get_socios_numsocio_list)
+from mysql_writer import (COMMIT_POLICY, NON_ROW_ERRNOS, REJECTS_TABLE, AdaptiveBatcher, CommitPolicy, bulk_load,
+                          ensure_indexes, ensure_rejects_table, estimate_row_bytes, format_rate, pending_rejects,
+                          publish_shadow_table, record_rejects, run_pipeline, shadow_table_name,
+                          sync_connection_options, table_exists)
+from table_plan import build_table_plan
+from db_pool import create_pool, mysql_config, pooled_connection
+from table_scheduler import run_table_syncs
 
-ACCESS_DB = os.getenv('COBRANZA_ACCESS_PATH', '/Users/nahuel/Documents/Desarrollos/P_M_Cobranza/BBDD/Datos1.mdb')
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él la clasificación usa el loop en Python
+    np = None
 
 # Tablas principales
 TABLES = [
@@ -28,65 +42,276 @@ TABLES = [
     'TblPromotores',   # SIN FILTRO (todas)
     'TbComentariosSocios'  # FILTRADO: Indirecto via socios del cobrador 30
 ]
+# Los filtros de cada tabla (TABLE_FILTERS) están en access_reader.py
 
-# 🔥 FILTROS: Solo cobrador 30 y relacionados
-TABLE_FILTERS = {
-    'Cobradores': {
-        'NUMCOB': '30'          # Solo cobrador 30
-    },
-    'Socios': {
-        'COBSOCIO': '30'        # Solo socios del cobrador 30
-    },
-    'Liquidaciones': {
-        'COBLIQUIDA': '30',     # Solo liquidaciones del cobrador 30
-        'BAJA': '1'             # Excluir liquidaciones dadas de baja (BAJA=1)
+# ⚠️ TABLAS CON FULL REFRESH: Se recargan completas en cada sync (como sync_ALL.py)
+FULL_REFRESH_TABLES = []
+
+# 🧮 TABLAS MULTISET: sin clave única confiable (duplicados reales, ej. Socios por
+# NUMSOCIO+NOMSOCIO). Se comparan como multiconjunto de row_hash: solo se insertan
+# las filas que sobran en Access y se borran las que sobran en MySQL.
+# Solo tablas de TABLES: la lista entra en la firma de configuración
+MULTISET_TABLES = ['Socios']
+
+# 🔎 FINGERPRINTS: saltar lo que no cambió desde la última sync
+# Se guardan en MySQL: uno para el archivo completo y uno por tabla
+FINGERPRINT_TABLE = 'sync_fingerprints'
+FILE_FINGERPRINT_KEY = '__file__'
+FINGERPRINT_VERSION = 2
+FORCE_SYNC = os.getenv('COBRANZA_FORCE_SYNC', '0') == '1'
+
+# Cambiar tablas, filtros, lector o formato de fechas de mdb-export (COBRANZA_ACCESS_ISO_DATES)
+# invalida los fingerprints guardados
+SYNC_CONFIG_SIGNATURE = hashlib.blake2b(
+    repr((FINGERPRINT_VERSION, TABLES, sorted(TABLE_FILTERS.items()), FULL_REFRESH_TABLES, MULTISET_TABLES,
+          ACCESS_READER, ISO_DATES)).encode(),
+    digest_size=8
+).hexdigest()
+
+def compute_file_fingerprint(path, chunk_size=8 * 1024 * 1024):
+    """Digest del archivo Access completo, leído por bloques sobre mmap"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, size, chunk_size):
+                    digest.update(mm[offset:offset + chunk_size])
+    digest.update(SYNC_CONFIG_SIGNATURE.encode())
+    return digest.hexdigest()
+
+def get_file_fingerprint(path, stored=None):
+    """
+    Retorna (fingerprint, file_stat) del archivo Access.
+    Si tamaño + mtime + configuración coinciden con lo guardado, no se vuelve a leer el archivo.
+    """
+    st = os.stat(path)
+    file_stat = f"{st.st_size}:{st.st_mtime_ns}:{SYNC_CONFIG_SIGNATURE}"
+    if stored and stored['file_stat'] == file_stat:
+        return stored['fingerprint'], file_stat
+    return compute_file_fingerprint(path), file_stat
+
+def compute_table_fingerprint(rows):
+    """Digest del contenido filtrado de una tabla (columnas + valores de cada fila)"""
+    all_cols = get_all_columns(rows)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\x1f'.join(all_cols).encode())
+    for row in rows:
+        digest.update(b'\x1e')
+        digest.update('\x1f'.join(access_text(row.get(col)) for col in all_cols).encode())
+    return digest.hexdigest()
+
+def ensure_fingerprint_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{FINGERPRINT_TABLE}` (
+            `name` VARCHAR(128) PRIMARY KEY,
+            `fingerprint` VARCHAR(64) NOT NULL,
+            `file_stat` VARCHAR(128) NULL,
+            `row_count` INT NULL,
+            `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+def load_fingerprints(cursor):
+    """Fingerprints guardados: {nombre: {'fingerprint', 'file_stat', 'row_count'}}"""
+    cursor.execute(f"SELECT `name`, `fingerprint`, `file_stat`, `row_count` FROM `{FINGERPRINT_TABLE}`")
+    return {
+        name: {'fingerprint': fingerprint, 'file_stat': file_stat, 'row_count': row_count}
+        for name, fingerprint, file_stat, row_count in cursor.fetchall()
     }
-}
 
-# ⚠️ TABLAS CON FULL REFRESH: No tienen clave única confiable
-# Se hace DROP/CREATE en cada sync (como sync_ALL.py)
-FULL_REFRESH_TABLES = ['Socios']
+def save_fingerprint(cursor, name, fingerprint, file_stat=None, row_count=None):
+    cursor.execute(
+        f"INSERT INTO `{FINGERPRINT_TABLE}` (`name`, `fingerprint`, `file_stat`, `row_count`) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE `fingerprint` = VALUES(`fingerprint`), `file_stat` = VALUES(`file_stat`), "
+        "`row_count` = VALUES(`row_count`)",
+        (name, fingerprint, file_stat, row_count)
+    )
 
-def get_mysql_connection():
-    config = {
-        'host': os.getenv('COBRANZA_DB_HOST'),
-        'user': os.getenv('COBRANZA_DB_USER'),
-        'password': os.getenv('COBRANZA_DB_PASSWORD'),
-        'database': os.getenv('COBRANZA_DB_NAME'),
-        'port': int(os.getenv('COBRANZA_DB_PORT', 3306)),
-        'autocommit': True
+# 📦 ESTADO LOCAL: clave → (id, row_hash, bucket) de la última sync, en SQLite junto al script
+# Evita traer la tabla completa de MySQL en cada corrida; se valida con un checksum barato
+# (filas + suma de CRC32 de id:row_hash + id máximo). Vacío = sin estado (siempre MySQL)
+STATE_DB_PATH = os.getenv(
+    'COBRANZA_STATE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sync_state.sqlite')
+) or ':memory:'
+STATE_STORE_VERSION = 3
+
+def open_state_store(path=STATE_DB_PATH):
+    """Una conexión por tabla/hilo: con WAL las tablas en paralelo leen mientras otra escribe"""
+    state = sqlite3.connect(path, timeout=30)
+    if path != ':memory:':
+        state.execute("PRAGMA journal_mode=WAL")
+    if state.execute("PRAGMA user_version").fetchone()[0] != STATE_STORE_VERSION:
+        # Formato viejo del estado: se descarta y se reconstruye desde MySQL
+        state.execute("DROP TABLE IF EXISTS table_state")
+        state.execute("DROP TABLE IF EXISTS records")
+        state.execute(f"PRAGMA user_version = {STATE_STORE_VERSION}")
+    state.execute("""
+        CREATE TABLE IF NOT EXISTS table_state (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            key_cols TEXT NOT NULL,
+            buckets INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            crc_sum INTEGER NOT NULL,
+            max_id INTEGER NOT NULL
+        )
+    """)
+    state.execute("""
+        CREATE TABLE IF NOT EXISTS records (
+            table_name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            row_hash TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            PRIMARY KEY (table_name, key)
+        ) WITHOUT ROWID
+    """)
+    state.commit()
+    return state
+
+def get_mysql_checksum(cursor, table_name):
+    """Checksum de la tabla en MySQL: (filas, suma de CRC32 de id:row_hash, id máximo)"""
+    cursor.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT(id, ':', COALESCE(row_hash, '')))), 0), "
+        f"COALESCE(MAX(id), 0) FROM `{table_name}`"
+    )
+    count, crc_sum, max_id = cursor.fetchone()
+    return int(count), int(crc_sum), int(max_id)
+
+def _dump_key(key):
+    """Clave (int, texto o tupla) → texto para el estado local"""
+    return json.dumps(key)
+
+def _load_key(text):
+    key = json.loads(text)
+    return tuple(key) if type(key) is list else key
+
+def load_state_records(state, table_name, key_codec, checksum=None):
+    """
+    Registros del estado local; None si no hay estado compatible.
+    Con checksum solo se devuelven si siguen vigentes contra MySQL.
+    """
+    saved = state.execute(
+        "SELECT version, key_cols, buckets, row_count, crc_sum, max_id FROM table_state WHERE table_name = ?",
+        (table_name,)
+    ).fetchone()
+    if (saved is None or saved[0] != STATE_STORE_VERSION or saved[1] != key_codec.signature
+            or saved[2] != DIFF_BUCKETS or (checksum is not None and tuple(saved[3:]) != checksum)):
+        return None
+    return {
+        _load_key(key): (row_id, row_hash, bucket)
+        for key, row_id, row_hash, bucket in state.execute(
+            "SELECT key, id, row_hash, bucket FROM records WHERE table_name = ?", (table_name,)
+        )
     }
-    return mysql.connector.connect(**config)
-
-def read_access_table(table_name, socios_numsocio_list=None):
-    """Leer tabla desde Access aplicando filtros si existen"""
-    result = subprocess.run(
-        ['mdb-export', ACCESS_DB, table_name],
-        capture_output=True,
-        text=True,
-        check=True
+
+def save_state_records(state, table_name, key_codec, checksum, records, changed_keys=None, deleted_keys=()):
+    """
+    Guarda el estado local de una tabla. Con changed_keys solo se reescriben esas
+    claves y se borran las de deleted_keys
+    """
+    with state:
+        if changed_keys is None:
+            state.execute("DELETE FROM records WHERE table_name = ?", (table_name,))
+            changed_keys = records.keys()
+        else:
+            state.executemany(
+                "DELETE FROM records WHERE table_name = ? AND key = ?",
+                ((table_name, _dump_key(key)) for key in deleted_keys)
+            )
+        state.executemany(
+            "INSERT OR REPLACE INTO records (table_name, key, id, row_hash, bucket) VALUES (?, ?, ?, ?, ?)",
+            ((table_name, _dump_key(key)) + records[key] for key in changed_keys)
+        )
+        state.execute(
+            "INSERT OR REPLACE INTO table_state (table_name, version, key_cols, buckets, row_count, crc_sum, max_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (table_name, STATE_STORE_VERSION, key_codec.signature, DIFF_BUCKETS) + tuple(checksum)
+        )
+
+# 🪣 BUCKETS (estilo Merkle): las filas se reparten por CRC32 del texto de la clave.
+# MySQL calcula (filas, suma de CRC32 de row_hash) por bucket con un GROUP BY y Access
+# calcula lo mismo en Python; solo los buckets que no coinciden se traen y se comparan.
+# Se usa SUM y no BIT_XOR para que dos filas iguales no se cancelen. 1 = sin buckets
+DIFF_BUCKETS = max(1, int(os.getenv('COBRANZA_DIFF_BUCKETS', 256)))
+
+def bucket_sql_expr(key_cols):
+    """Expresión SQL del bucket de una fila (mismo cálculo que access_key_bucket)"""
+    parts = ', '.join(f"COALESCE(CAST(`{col}` AS CHAR), '')" for col in key_cols)
+    return f"CRC32(CONCAT_WS('|', {parts})) % {DIFF_BUCKETS}"
+
+def access_key_bucket(row, key_cols):
+    """Bucket de una fila de Access: CRC32 del texto crudo de la clave, como lo guarda MySQL"""
+    parts = [access_text(row.get(col)) for col in key_cols]
+    return zlib.crc32('|'.join(parts).encode()) % DIFF_BUCKETS
+
+def get_mysql_bucket_checksums(cursor, table_name, key_cols):
+    """
+    Checksums por bucket en MySQL: {bucket: (filas, suma CRC32 row_hash, suma CRC32 id:row_hash)}.
+    Las filas con baja lógica (row_hash NULL) no cuentan para comparar contra Access.
+    """
+    cursor.execute(
+        f"SELECT {bucket_sql_expr(key_cols)} AS bucket, SUM(row_hash IS NOT NULL), "
+        f"COALESCE(SUM(CRC32(row_hash)), 0), SUM(CRC32(CONCAT(id, ':', COALESCE(row_hash, '')))) "
+        f"FROM `{table_name}` GROUP BY bucket"
     )
-    reader = csv.DictReader(StringIO(result.stdout))
-    rows = list(reader)
-
-    # Aplicar filtros en Python si existen para esta tabla
-    if table_name in TABLE_FILTERS:
-        filters = TABLE_FILTERS[table_name]
-
-        # Filtro genérico: Para cada clave en filters
-        for field, value in filters.items():
-            if field == 'BAJA':
-                # BAJA: excluir si BAJA=value (normalmente '1')
-                rows = [row for row in rows if row.get(field) != value]
-            else:
-                # Otros campos: incluir solo si campo=value
-                rows = [row for row in rows if row.get(field) == value]
+    return {int(bucket): (int(count), int(hash_sum), int(id_sum))
+            for bucket, count, hash_sum, id_sum in cursor.fetchall()}
+
+def state_bucket_checksums(records):
+    """Los mismos checksums por bucket, calculados sobre registros {clave: (id, row_hash, bucket)}"""
+    sums = {}
+    for row_id, row_hash, bucket in records.values():
+        count, hash_sum, id_sum = sums.get(bucket, (0, 0, 0))
+        sums[bucket] = (count + 1 if row_hash else count,
+                        hash_sum + zlib.crc32(row_hash.encode()),
+                        id_sum + zlib.crc32(f"{row_id}:{row_hash}".encode()))
+    return sums
+
+def access_bucket_checksums(buckets, hashes):
+    """Checksums por bucket del lado de Access: {bucket: (filas, suma CRC32 row_hash)}"""
+    sums = {}
+    for bucket, row_hash in zip(buckets, hashes):
+        count, hash_sum = sums.get(bucket, (0, 0))
+        sums[bucket] = (count + 1, hash_sum + zlib.crc32(row_hash.encode()))
+    return sums
+
+def load_bucketed_records(cursor, state, table_name, key_cols, key_codec, checksum, access_sums):
+    """
+    Registros existentes + buckets a comparar.
+
+    Si el checksum global de MySQL coincide con el estado local, todo sale del
+    estado. Si no, se comparan los checksums por bucket de MySQL contra los del
+    estado y solo se traen de MySQL los buckets que difieren (sin estado: todos).
+    Retorna (registros, buckets_sucios, buckets_traidos, desde_estado) donde
+    buckets_sucios son los que no coinciden entre Access y MySQL.
+    """
+    records = load_state_records(state, table_name, key_codec, checksum)
+    from_state = records is not None
+    pulled = 0
+    if from_state:
+        mysql_sums = state_bucket_checksums(records)
+    else:
+        mysql_sums = get_mysql_bucket_checksums(cursor, table_name, key_cols)
+        records = load_state_records(state, table_name, key_codec) or {}
+        state_sums = state_bucket_checksums(records)
+        stale = {b for b in set(mysql_sums) | set(state_sums) if mysql_sums.get(b) != state_sums.get(b)}
+        if stale:
+            records = {key: rec for key, rec in records.items() if rec[2] not in stale}
+            records.update(get_existing_records(cursor, table_name, key_cols, key_codec, buckets=stale))
+            pulled = len(stale)
+
+    dirty = {b for b in set(mysql_sums) | set(access_sums)
+             if (mysql_sums[b][:2] if b in mysql_sums else None) != access_sums.get(b)}
+    return records, dirty, pulled, from_state
 
-    # Filtro especial para TbComentariosSocios: solo comentarios de socios filtrados
-    if table_name == 'TbComentariosSocios' and socios_numsocio_list:
-        rows = [row for row in rows if row.get('NUMSOCIO') in socios_numsocio_list]
+def get_mysql_connection():
+    return mysql.connector.connect(**mysql_config(**sync_connection_options()))
 
-    return rows
+# Tablas que se sincronizan a la vez, cada una con su conexión (1 = una tras otra)
+SYNC_WORKERS = max(1, int(os.getenv('COBRANZA_SYNC_WORKERS', 3)))
 
 def get_all_columns(rows):
     """Obtener todas las columnas únicas de todos los registros"""
@@ -147,34 +372,6 @@ def infer_column_type(col_name):
     else:
         return 'VARCHAR(255) NULL'
 
-def convert_date_value(value):
-    """Convertir fechas de formato Access a formato MySQL"""
-    if not value or value == '':
-        return None
-    
-    try:
-        # Access exporta fechas como: "01/27/22 00:00:00"
-        # Intentar varios formatos
-        for fmt in ['%m/%d/%y %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S']:
-            try:
-                dt = datetime.strptime(value, fmt)
-                # Convertir a formato MySQL: YYYY-MM-DD HH:MM:SS
-                return dt.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                continue
-        return None
-    except:
-        return None
-
-def calculate_row_hash(row, columns):
-    """Calcula hash de una fila para detectar cambios"""
-    values = []
-    for col in sorted(columns):
-        val = row.get(col, '')
-        values.append(str(val) if val else 'NULL')
-    content = '|'.join(values)
-    return hashlib.sha256(content.encode()).hexdigest()
-
 def get_unique_key_column(table_name, all_cols):
     """
     Determina LA columna o COLUMNAS únicas de cada tabla según Access.
@@ -208,44 +405,170 @@ def get_unique_key_column(table_name, all_cols):
         valid_cols = [all_cols[0]]
     return valid_cols
 
-def normalize_key_value(value):
-    """Normaliza valores para comparación (maneja decimales, espacios, etc.)"""
+# 🔑 CODECS DE CLAVE: se eligen una vez por tabla según el tipo de columna en MySQL.
+# Convierten la clave de Access y la de MySQL al mismo valor compacto: int para
+# columnas numéricas, texto sin espacios para el resto y tupla para claves compuestas
+KeyCodec = namedtuple('KeyCodec', ['from_row', 'from_values', 'signature'])
+
+INT_KEY_TYPES = ('tinyint', 'smallint', 'mediumint', 'int', 'bigint', 'decimal', 'double', 'float')
+
+def _int_key(value):
+    """Clave numérica: int (o float si no es entera); None si está vacía"""
+    if value is None or value == '':
+        return None
+    if type(value) is int:
+        return value
+    if type(value) is str:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    # '30.0', Decimal('30.0000'), 30.0 → 30
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+    return int(f) if f.is_integer() else f
+
+def _text_key(value):
+    """Clave de texto: sin espacios alrededor; vacía si es None"""
     if value is None:
         return ''
-    s = str(value).strip()
-    # Si parece un número decimal, convertir a float y luego a string sin ceros innecesarios
-    try:
-        f = float(s)
-        # Si es entero, devolver sin decimales
-        if f == int(f):
-            return str(int(f))
-        return str(f)
-    except:
-        return s
-
-def get_existing_records(cursor, table_name, unique_key_cols):
-    """Carga registros existentes: {unique_key_value: (id, row_hash)}"""
+    return access_text(value).strip()
+
+def get_column_types(cursor, table_name):
+    """{columna: tipo MySQL en minúsculas, ej. 'int(11)', 'varchar(255)'}"""
+    cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
+    return {row[0]: str(row[1]).lower() for row in cursor.fetchall()}
+
+def build_key_codec(key_cols, col_types):
+    """Codec de clave de una tabla: un convertidor por columna, elegido una sola vez"""
+    kinds = ['int' if col_types.get(col, '').startswith(INT_KEY_TYPES) else 'text' for col in key_cols]
+    parts = [_int_key if kind == 'int' else _text_key for kind in kinds]
+    signature = '|'.join(f"{col}:{kind}" for col, kind in zip(key_cols, kinds))
+
+    if len(key_cols) == 1:
+        col, part = key_cols[0], parts[0]
+        return KeyCodec(
+            from_row=lambda row: part(row.get(col)),
+            from_values=lambda values: part(values[0]),
+            signature=signature
+        )
+
+    pairs = list(zip(key_cols, parts))
+    return KeyCodec(
+        from_row=lambda row: tuple([part(row.get(col)) for col, part in pairs]),
+        from_values=lambda values: tuple([part(value) for part, value in zip(parts, values)]),
+        signature=signature
+    )
+
+# Clasificación vectorizada con NumPy (opcional: sin NumPy se usa el loop en Python)
+# Motor del diff: 'python' (dict, default) o 'numpy' (sort + searchsorted).
+# Con los volúmenes actuales (~100k filas) el dict sigue siendo más rápido;
+# numpy queda disponible para tablas grandes. Por debajo de NUMPY_DIFF_MIN_ROWS
+# filas siempre se usa el loop en Python.
+DIFF_ENGINE = os.getenv('COBRANZA_DIFF_ENGINE', 'python').strip().lower()
+NUMPY_DIFF_MIN_ROWS = 2000
+
+def classify_rows(keys, hashes, existing_records):
+    """
+    Clasificar filas de Access contra los registros existentes en MySQL.
+
+    keys/hashes: listas paralelas, una entrada por fila de Access
+    existing_records: {clave: (id, row_hash, ...)}
+    Retorna (indices_nuevos, cambiados, sin_cambios) donde cambiados es una
+    lista de (indice, id_existente, hash_existente).
+    """
+    if (DIFF_ENGINE == 'numpy' and np is not None and existing_records
+            and len(keys) >= NUMPY_DIFF_MIN_ROWS):
+        return _classify_rows_numpy(keys, hashes, existing_records)
+
+    insert_idx = []
+    changed = []
+    unchanged = 0
+    for i, key_value in enumerate(keys):
+        existing = existing_records.get(key_value)
+        if existing is None:
+            insert_idx.append(i)
+        elif existing[1] == hashes[i]:
+            unchanged += 1
+        else:
+            changed.append((i, existing[0], existing[1]))
+    return insert_idx, changed, unchanged
+
+def _key_array(keys):
+    """Claves como array NumPy: int64 si son todas enteras, texto de ancho fijo si no"""
+    # Todas, no solo la primera: np.fromiter trunca floats sin error (30.5 → 30) y daría falsas coincidencias
+    if keys and all(type(key) is int for key in keys):
+        try:
+            return np.fromiter(keys, dtype=np.int64, count=len(keys))
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return np.array([str(k) for k in keys])
+
+def _digest_array(hex_hashes):
+    """row_hash hex → array de digests de ancho fijo (16 bytes). Los que no son del
+    largo actual (SHA-256 viejo, vacío) quedan en cero y nunca coinciden"""
+    width = ROW_HASH_DIGEST_SIZE * 2
+    zero = '0' * width
+    hex_hashes = [h if h and len(h) == width else zero for h in hex_hashes]
+    return np.frombuffer(bytes.fromhex(''.join(hex_hashes)), dtype=f'V{ROW_HASH_DIGEST_SIZE}')
+
+def _classify_rows_numpy(keys, hashes, existing_records):
+    """Misma clasificación con sort + searchsorted sobre arrays de claves y digests"""
+    existing_values = list(existing_records.values())
+    existing_keys = _key_array(list(existing_records.keys()))
+    existing_ids = np.fromiter((rec[0] for rec in existing_values), dtype=np.int64, count=len(existing_values))
+    existing_hashes = _digest_array([rec[1] for rec in existing_values])
+    access_keys = _key_array(keys)
+    access_hashes = _digest_array(hashes)
+
+    if existing_keys.dtype != access_keys.dtype:
+        # Claves enteras de un lado y texto del otro: comparar todo como texto
+        existing_keys = existing_keys.astype(str)
+        access_keys = access_keys.astype(str)
+
+    # Ubicar cada clave de Access en las claves de MySQL ordenadas
+    order = np.argsort(existing_keys, kind='stable')
+    sorted_keys = existing_keys[order]
+    pos = np.minimum(np.searchsorted(sorted_keys, access_keys), len(sorted_keys) - 1)
+    found = sorted_keys[pos] == access_keys
+    match = order[pos]
+    same_hash = found & (existing_hashes[match] == access_hashes)
+
+    insert_idx = np.flatnonzero(~found).tolist()
+    changed_idx = np.flatnonzero(found & ~same_hash).tolist()
+    changed = [(i, int(existing_ids[match[i]]), existing_values[match[i]][1] or '') for i in changed_idx]
+    return insert_idx, changed, int(same_hash.sum())
+
+def get_existing_records(cursor, table_name, unique_key_cols, key_codec, min_id=None, buckets=None):
+    """
+    Carga registros existentes: {unique_key_value: (id, row_hash, bucket)}.
+    Con min_id solo los de id > min_id; con buckets solo los de esos buckets.
+    """
     records = {}
     skipped_nulls = 0
     duplicates_found = 0
     try:
         # Construir SELECT con todas las columnas clave
         cols_select = ', '.join([f'`{col}`' for col in unique_key_cols])
-        cursor.execute(f"SELECT id, {cols_select}, row_hash FROM `{table_name}`")
+        conditions = []
+        if min_id is not None:
+            conditions.append(f"id > {int(min_id)}")
+        if buckets is not None:
+            conditions.append(f"{bucket_sql_expr(unique_key_cols)} IN ({', '.join(str(int(b)) for b in buckets)})")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        cursor.execute(f"SELECT id, {cols_select}, row_hash, {bucket_sql_expr(unique_key_cols)} "
+                       f"FROM `{table_name}`{where}")
         
         for row in cursor.fetchall():
             row_id = row[0]
-            # row_hash es siempre la última columna
+            # row_hash y bucket son siempre las dos últimas columnas
             row_hash_idx = len(unique_key_cols) + 1  # id + columnas_clave + row_hash
             row_hash = row[row_hash_idx] if row[row_hash_idx] else ''
+            bucket = int(row[row_hash_idx + 1])
             
-            # Si hay múltiples columnas clave, concatenar con |
-            if len(unique_key_cols) == 1:
-                key_value = normalize_key_value(row[1])
-            else:
-                # Concatenar todas las columnas clave
-                key_parts = [normalize_key_value(row[i+1]) for i in range(len(unique_key_cols))]
-                key_value = '|'.join(key_parts)
+            key_value = key_codec.from_values(row[1:row_hash_idx])
             
             # DEBUG: Detectar colisiones y valores vacíos
             if key_value in records:
@@ -253,12 +576,12 @@ def get_existing_records(cursor, table_name, unique_key_cols):
                 if table_name == 'Socios' and duplicates_found <= 5:
                     print(f"   ⚠️  Clave duplicada detectada: '{key_value}' (IDs: {records[key_value][0]} y {row_id})")
             
-            if '|' in key_value and (key_value.startswith('|') or key_value.endswith('|') or '||' in key_value):
+            if type(key_value) is tuple and ('' in key_value or None in key_value):
                 skipped_nulls += 1
                 if table_name == 'Socios' and skipped_nulls <= 5:
                     print(f"   ⚠️  Registro con NULL en clave: '{key_value}' (ID: {row_id})")
             
-            records[key_value] = (row_id, row_hash)
+            records[key_value] = (row_id, row_hash, bucket)
         
         if table_name == 'Socios' and (duplicates_found > 0 or skipped_nulls > 0):
             print(f"   ⚠️  Total duplicados: {duplicates_found}, Total con NULLs: {skipped_nulls}")
@@ -267,10 +590,179 @@ def get_existing_records(cursor, table_name, unique_key_cols):
         pass  # Tabla no existe o está vacía
     return records
 
-def sync_table_full_refresh(table_name, conn, cursor, rows):
+# 🗑️ BAJAS: claves que están en MySQL pero ya no en Access (borradas o filtradas, ej. BAJA=1)
+# 'hard' = DELETE, 'soft' = marca deleted_at y deja row_hash en NULL, 'off' = no propagar
+DELETE_MODE = os.getenv('COBRANZA_DELETE_MODE', 'hard').strip().lower()
+# Si hay que borrar más que esta fracción de la tabla se asume un error de lectura y no se borra nada
+DELETE_MAX_RATIO = float(os.getenv('COBRANZA_DELETE_MAX_RATIO', 0.5))
+# Corridas de ids consecutivos desde este largo se borran con BETWEEN en vez de IN
+DELETE_RANGE_MIN = 50
+
+def has_column(cursor, table_name, column):
+    cursor.execute(f"SHOW COLUMNS FROM `{table_name}` LIKE %s", (column,))
+    return cursor.fetchone() is not None
+
+def count_mysql_rows(cursor, table_name, active_only=False):
+    """Filas de la tabla en MySQL (active_only: sin las bajas lógicas); 0 si la tabla no existe"""
+    if not table_exists(cursor, table_name):
+        return 0
+    where = ""
+    if active_only and has_column(cursor, table_name, 'deleted_at'):
+        where = " WHERE deleted_at IS NULL"
+    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`{where}")
+    return cursor.fetchone()[0]
+
+def sync_empty_table(cursor, table_name):
+    """
+    Tabla vacía en Access (ej. sin filas después de los filtros): si en MySQL tampoco hay
+    filas está sincronizada. Si MySQL tiene filas no se borran (puede ser un export cortado)
+    y la tabla queda sin sincronizar
+    """
+    count = count_mysql_rows(cursor, table_name, active_only=True)
+    if count == 0:
+        print(f"   ✅ Tabla vacía en Access y en MySQL, nada que sincronizar")
+        return True
+    print(f"   ⚠️  Tabla vacía en Access pero con {count:,} registros en MySQL, no se modifica")
+    return False
+
+def find_deleted_records(existing_records, access_keys, soft=False):
+    """[(clave, id)] de los registros de MySQL cuya clave ya no está en Access.
+    En modo soft se saltan los que ya tienen baja lógica (row_hash vacío)"""
+    return [(key, rec[0]) for key, rec in existing_records.items()
+            if key not in access_keys and (rec[1] or not soft)]
+
+def delete_ids(cursor, table_name, ids, soft=False, batch_size=1000):
     """
-    FULL REFRESH: DROP + CREATE + INSERT (como sync_ALL.py)
-    Se usa para tablas sin clave única confiable (ej: Socios)
+    Borrar (o dar de baja lógica) filas por id en lotes.
+    Los ids consecutivos van por rango (BETWEEN); el resto por IN de hasta batch_size.
+    """
+    if soft:
+        action = f"UPDATE `{table_name}` SET deleted_at = CURRENT_TIMESTAMP, row_hash = NULL"
+    else:
+        action = f"DELETE FROM `{table_name}`"
+
+    ranges = []
+    singles = []
+    ids = sorted(ids)
+    start = 0
+    for i in range(1, len(ids) + 1):
+        if i == len(ids) or ids[i] != ids[i - 1] + 1:
+            if i - start >= DELETE_RANGE_MIN:
+                ranges.append((ids[start], ids[i - 1]))
+            else:
+                singles.extend(ids[start:i])
+            start = i
+
+    affected = 0
+    for low, high in ranges:
+        cursor.execute(f"{action} WHERE id BETWEEN %s AND %s", (low, high))
+        affected += cursor.rowcount
+    for i in range(0, len(singles), batch_size):
+        batch = singles[i:i+batch_size]
+        cursor.execute(f"{action} WHERE id IN ({', '.join(['%s'] * len(batch))})", tuple(batch))
+        affected += cursor.rowcount
+    return affected
+
+def insert_rows(cursor, plan, to_insert):
+    """INSERT en batches de filas de Access con su row_hash ya calculado: [(fila, row_hash)]"""
+    cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+    
+    insert_sql = plan.insert_sql()
+    rejects = []
+    batcher = AdaptiveBatcher(cursor)
+    
+    def transform(batch):
+        return plan.rows_values([row for row, _ in batch], [row_hash for _, row_hash in batch])
+    
+    def load(values):
+        # Batches por filas/bytes según la latencia; si uno falla se parte en mitades
+        return batcher.execute(cursor, insert_sql, values, rejects)
+    
+    # Los valores de los próximos batches se arman en otro hilo mientras este espera a MySQL
+    inserted = run_pipeline(to_insert, transform, load)
+    record_rejects(cursor, plan.table_name, rejects, plan.write_columns)
+    
+    cursor.execute("SET FOREIGN_KEY_CHECKS=1")
+    return inserted
+
+# ✏️ UPDATES: cómo se aplican las filas modificadas
+# 'staging' (default): executemany a una tabla temporal + un solo UPDATE … JOIN por tabla
+# 'upsert': INSERT … ON DUPLICATE KEY UPDATE por id en batches
+# 'row': un UPDATE por fila (comportamiento anterior, un round trip por fila)
+UPDATE_MODE = os.getenv('COBRANZA_UPDATE_MODE', 'staging').strip().lower()
+
+def update_rows(cursor, plan, to_update, reactivate=False, mode=None):
+    """
+    Aplicar filas modificadas: [(id, fila, row_hash)]. Retorna el set de ids actualizados.
+    reactivate: limpiar deleted_at (la tabla tiene bajas lógicas).
+    Las filas que MySQL rechaza se aíslan partiendo el batch y van a sync_rejects;
+    si falla el UPDATE masivo se reintenta fila por fila.
+    """
+    mode = mode or UPDATE_MODE
+    table_name = plan.table_name
+    data_cols = [f'`{col}`' for col in plan.write_columns]
+    reject_cols = ['id'] + plan.write_columns
+    values = plan.rows_values([row for _, row, _ in to_update], [row_hash for _, _, row_hash in to_update])
+    params = [(existing_id,) + row_values for row_values, (existing_id, _, _) in zip(values, to_update)]
+    applied = set()
+    rejects = []
+
+    if mode == 'staging':
+        staging = f"{table_name}__staging"
+        insert_sql = (f"INSERT INTO `{staging}` (`id`, {', '.join(data_cols)}) "
+                      f"VALUES ({', '.join(['%s'] * (len(data_cols) + 1))})")
+        set_clause = ', '.join(f"t.{col} = s.{col}" for col in data_cols)
+        if reactivate:
+            set_clause += ", t.deleted_at = NULL"
+        try:
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{staging}`")
+            cursor.execute(f"CREATE TEMPORARY TABLE `{staging}` LIKE `{table_name}`")
+            AdaptiveBatcher(cursor).execute(cursor, insert_sql, params, rejects)
+            cursor.execute(f"UPDATE `{table_name}` t JOIN `{staging}` s ON t.id = s.id "
+                           f"SET {set_clause}, t.updated_at = CURRENT_TIMESTAMP")
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{staging}`")
+            record_rejects(cursor, table_name, rejects, reject_cols)
+            rejected_ids = {values[0] for values, _ in rejects}
+            return {p[0] for p in params if p[0] not in rejected_ids}
+        except Exception as e:
+            if getattr(e, 'errno', None) in NON_ROW_ERRNOS:
+                raise
+            print(f"   ⚠️  Error en UPDATE por staging ({e}), se sigue fila por fila")
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{staging}`")
+            rejects = []
+
+    elif mode == 'upsert':
+        update_clause = ', '.join(f"{col} = VALUES({col})" for col in data_cols)
+        if reactivate:
+            update_clause += ", deleted_at = NULL"
+        upsert_sql = (f"INSERT INTO `{table_name}` (`id`, {', '.join(data_cols)}) "
+                      f"VALUES ({', '.join(['%s'] * (len(data_cols) + 1))}) "
+                      f"ON DUPLICATE KEY UPDATE {update_clause}, updated_at = CURRENT_TIMESTAMP")
+        AdaptiveBatcher(cursor).execute(cursor, upsert_sql, params, rejects)
+        record_rejects(cursor, table_name, rejects, reject_cols)
+        rejected_ids = {values[0] for values, _ in rejects}
+        return {p[0] for p in params if p[0] not in rejected_ids}
+
+    # Fila por fila: un UPDATE por id
+    set_clause = ', '.join(f"{col} = %s" for col in data_cols)
+    if reactivate:
+        set_clause += ", deleted_at = NULL"
+    update_sql = f"UPDATE `{table_name}` SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = %s"
+    for p in params:
+        try:
+            cursor.execute(update_sql, p[1:] + (p[0],))
+            applied.add(p[0])
+        except Exception as e:
+            if getattr(e, 'errno', None) in NON_ROW_ERRNOS:
+                raise
+            rejects.append((p, str(e)))
+    record_rejects(cursor, table_name, rejects, reject_cols)
+    return applied
+
+def sync_table_full_refresh(table_name, conn, cursor, rows, hashes=None):
+    """
+    FULL REFRESH: CREATE + INSERT en `<tabla>__new` y RENAME atómico (como sync_ALL.py)
+    Se usa para FULL_REFRESH_TABLES y como recarga de las tablas multiset (hashes: row_hash ya calculados)
     """
     print(f"\n{'='*80}")
     print(f"TABLA: {table_name} [FULL REFRESH]")
@@ -282,11 +774,21 @@ def sync_table_full_refresh(table_name, conn, cursor, rows):
     print(f"2. Analizando esquema...")
     all_cols = get_all_columns(rows)
     print(f"   ✅ {len(all_cols)} columnas encontradas")
+    plan = build_table_plan(table_name, all_cols)
+    
+    # Filas que MySQL ya rechazó y no cambiaron desde entonces: no se reintentan
+    if hashes is None:
+        hashes = [plan.row_hash(row) for row in rows]
+    rejected = pending_rejects(cursor, table_name, hashes)
+    to_load = [(row, row_hash) for row, row_hash in zip(rows, hashes) if row_hash not in rejected]
+    if len(to_load) < len(rows):
+        print(f"   ⏭️  {len(rows) - len(to_load):,} filas rechazadas antes y sin cambios: se saltan ({REJECTS_TABLE})")
     
-    # 3. Crear tabla
-    print(f"3. Recreando tabla...")
+    # 3. Crear tabla sombra: la tabla en uso sigue intacta hasta el RENAME final
+    shadow = shadow_table_name(table_name)
+    print(f"3. Creando tabla {shadow}...")
     try:
-        cursor.execute(f"DROP TABLE IF EXISTS `{table_name}`")
+        cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
         
         col_defs = ["`id` INT AUTO_INCREMENT PRIMARY KEY"]
         for col in all_cols:
@@ -296,54 +798,188 @@ def sync_table_full_refresh(table_name, conn, cursor, rows):
         col_defs.append("`created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
         col_defs.append("`updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
         
-        create_sql = f"CREATE TABLE `{table_name}` ({', '.join(col_defs)}) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+        create_sql = f"CREATE TABLE `{shadow}` ({', '.join(col_defs)}) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
         cursor.execute(create_sql)
-        print(f"   ✅ Tabla recreada")
+        print(f"   ✅ Tabla creada")
     except Exception as e:
         print(f"   ❌ Error creando tabla: {e}")
-        return
+        return False
     
-    # 4. Insertar datos
-    print(f"4. Insertando {len(rows):,} registros...")
-    try:
-        batch_size = 1000
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i+batch_size]
-            
-            if i > 0 and i % 10000 == 0:
-                print(f"   ... {i:,} / {len(rows):,}")
-            
-            # Preparar datos con hash
-            insert_data = []
-            for row in batch:
-                values = []
-                for col in all_cols:
-                    val = row.get(col, None)
-                    val = val if val != '' else None
-                    # Convertir fechas
-                    col_upper = col.upper()
-                    if val and ('FEC' in col_upper or 'FECHA' in col_upper or 'DATE' in col_upper or 
-                               col_upper in ['PERLIQUIDANRO', 'F1CSOCIO', 'FBUSCAHR', 'ALTCOB', 'ALTSOCIO', 'BAJAFECHA']):
-                        val = convert_date_value(val)
-                    values.append(val)
-                
-                # Calcular hash
-                row_hash = calculate_row_hash(row, all_cols)
-                values.append(row_hash)
-                insert_data.append(tuple(values))
-            
-            # INSERT
-            placeholders = ', '.join(['%s'] * (len(all_cols) + 1))  # +1 por row_hash
-            cols = ', '.join([f'`{col}`' for col in all_cols] + ['`row_hash`'])
-            insert_sql = f"INSERT INTO `{table_name}` ({cols}) VALUES ({placeholders})"
-            cursor.executemany(insert_sql, insert_data)
+    # 4. Insertar datos: LOAD DATA LOCAL INFILE, o INSERT en batches si el servidor no lo permite
+    print(f"4. Insertando {len(to_load):,} registros...")
+    insert_sql = plan.insert_sql(shadow)
+    
+    # Transacciones acotadas: la tabla sombra no la lee nadie hasta el RENAME
+    commit_policy = CommitPolicy(conn)
+    rejects = []
+    
+    def insert_batches(to_load):
+        # Pipeline: las tuplas (fechas + hash) de los próximos batches se arman en otro hilo
+        # mientras este espera a MySQL
+        progress = {'inserted': 0, 'next_report': 10000}
+        batcher = AdaptiveBatcher(cursor)
+        
+        def transform(batch):
+            return plan.rows_values([row for row, _ in batch], [row_hash for _, row_hash in batch])
         
-        print(f"   ✅ COMPLETADO: {len(rows):,} registros en MySQL")
+        def load(values):
+            applied = batcher.execute(cursor, insert_sql, values, rejects)
+            commit_policy.add(applied, sum(estimate_row_bytes(v) for v in values))
+            progress['inserted'] += applied
+            if progress['inserted'] >= progress['next_report']:
+                print(f"   ... {progress['inserted']:,} / {len(to_load):,}")
+                progress['next_report'] += 10000
+            return applied
+        
+        inserted = run_pipeline(to_load, transform, load)
+        print(f"   📏 {batcher.statements:,} INSERT, batch final de {batcher.rows:,} filas")
+        return inserted
+    
+    def to_values(item):
+        return plan.row_values(*item)
+    
+    try:
+        inserted, method, seconds = bulk_load(cursor, shadow, plan.write_columns, to_load,
+                                              to_values, insert_batches)
+        print(f"   ⏱️  {format_rate(inserted, seconds, method)}")
+        record_rejects(cursor, table_name, rejects, plan.write_columns)
+        commit_policy.commit()
+        if commit_policy.commits > 1:
+            print(f"   💾 {commit_policy.commits:,} commits ({COMMIT_POLICY})")
+        # Índices con la tabla ya cargada (una sola pasada en vez de mantenerlos fila por fila)
+        created = ensure_indexes(cursor, table_name, shadow)
+        if created:
+            print(f"   📇 Índices: {', '.join(created)}")
+        # 5. Verificar filas y publicar con un RENAME atómico (la versión anterior queda en __old)
+        published = publish_shadow_table(cursor, table_name, len(to_load) - len(rejects))
+        print(f"   ✅ COMPLETADO: {published:,} registros en MySQL")
     except Exception as e:
+        commit_policy.rollback()
         print(f"   ❌ Error insertando: {e}")
+        return False
+    return True
+
+def get_mysql_hash_bucket_checksums(cursor, table_name):
+    """Checksums por bucket de row_hash (tablas multiset): {bucket: (filas, suma CRC32 row_hash)}"""
+    cursor.execute(
+        f"SELECT CRC32(row_hash) % {DIFF_BUCKETS} AS bucket, COUNT(*), SUM(CRC32(row_hash)) "
+        f"FROM `{table_name}` WHERE row_hash IS NOT NULL GROUP BY bucket"
+    )
+    return {int(bucket): (int(count), int(hash_sum)) for bucket, count, hash_sum in cursor.fetchall()}
 
-def sync_table_incremental(table_name, conn, cursor, socios_numsocio_list=None):
-    """Sincronización INCREMENTAL: INSERT nuevos, UPDATE cambios"""
+def get_mysql_hashes(cursor, table_name, buckets):
+    """(id, row_hash) de las filas de esos buckets de row_hash, de id mayor a menor"""
+    cursor.execute(
+        f"SELECT id, row_hash FROM `{table_name}` WHERE row_hash IS NOT NULL "
+        f"AND CRC32(row_hash) % {DIFF_BUCKETS} IN ({', '.join(str(int(b)) for b in buckets)}) ORDER BY id DESC"
+    )
+    return cursor.fetchall()
+
+def multiset_diff(access_hashes, mysql_rows):
+    """
+    Diferencia exacta de multiconjuntos de row_hash.
+
+    access_hashes: un row_hash por fila de Access
+    mysql_rows: [(id, row_hash)] de MySQL, de id mayor a menor
+    Retorna (indices_a_insertar, ids_a_borrar, sin_cambios). Entre filas
+    repetidas se conservan los ids más viejos.
+    """
+    ids_by_hash = {}
+    for row_id, row_hash in mysql_rows:
+        ids_by_hash.setdefault(row_hash, []).append(row_id)
+    insert_idx = []
+    unchanged = 0
+    for i, row_hash in enumerate(access_hashes):
+        ids = ids_by_hash.get(row_hash)
+        if ids:
+            ids.pop()
+            unchanged += 1
+        else:
+            insert_idx.append(i)
+    delete = [row_id for ids in ids_by_hash.values() for row_id in ids]
+    return insert_idx, delete, unchanged
+
+def sync_table_multiset(table_name, conn, cursor, rows):
+    """
+    MULTISET: la tabla se compara como multiconjunto de row_hash, sin clave única.
+    Un cambio en una fila es una baja + un alta. Las filas se reparten en buckets
+    por CRC32 del row_hash y solo se traen de MySQL los buckets que difieren.
+    """
+    print(f"\n{'='*80}")
+    print(f"TABLA: {table_name} [MULTISET]")
+    print('='*80)
+    
+    print(f"1. Registros a sincronizar: {len(rows):,}")
+    if not rows:
+        return sync_empty_table(cursor, table_name)
+    all_cols = get_all_columns(rows)
+    print(f"2. Columnas: {len(all_cols)}")
+    plan = build_table_plan(table_name, all_cols)
+    
+    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
+    if cursor.fetchone() is None:
+        print(f"   ℹ️  Tabla no existe, carga completa")
+        return sync_table_full_refresh(table_name, conn, cursor, rows)
+    created = ensure_indexes(cursor, table_name)
+    if created:
+        print(f"   📇 Índices creados: {', '.join(created)}")
+    
+    # 3. Comparar buckets de row_hash contra MySQL y traer solo los distintos
+    print(f"3. Comparando buckets...")
+    hashes = [plan.row_hash(row) for row in rows]
+    buckets = [zlib.crc32(row_hash.encode()) % DIFF_BUCKETS for row_hash in hashes]
+    access_sums = access_bucket_checksums(buckets, hashes)
+    mysql_sums = get_mysql_hash_bucket_checksums(cursor, table_name)
+    dirty = {b for b in set(mysql_sums) | set(access_sums) if mysql_sums.get(b) != access_sums.get(b)}
+    existing_count = sum(count for count, _ in mysql_sums.values())
+    mysql_rows = get_mysql_hashes(cursor, table_name, dirty) if dirty else []
+    print(f"   🪣 Buckets distintos: {len(dirty):,} de {DIFF_BUCKETS:,} ({len(mysql_rows):,} filas leídas de MySQL)")
+    
+    # 4. Diferencia de multiconjuntos dentro de los buckets distintos
+    diff_idx = [i for i, bucket in enumerate(buckets) if bucket in dirty]
+    sub_insert, to_delete, unchanged = multiset_diff([hashes[i] for i in diff_idx], mysql_rows)
+    unchanged += len(rows) - len(diff_idx)
+    to_insert = [(rows[diff_idx[j]], hashes[diff_idx[j]]) for j in sub_insert]
+    print(f"4. 📊 Altas: {len(to_insert):,} | Bajas: {len(to_delete):,} | Sin cambios: {unchanged:,}")
+    
+    # Altas que MySQL ya rechazó y no cambiaron desde entonces: no se reintentan
+    rejected = pending_rejects(cursor, table_name, hashes)
+    if rejected:
+        pending = len(to_insert)
+        to_insert = [(row, row_hash) for row, row_hash in to_insert if row_hash not in rejected]
+        if len(to_insert) < pending:
+            print(f"   ⏭️  {pending - len(to_insert):,} altas rechazadas antes y sin cambios: se saltan ({REJECTS_TABLE})")
+    
+    if to_delete and DELETE_MODE not in ('hard', 'soft'):
+        # COBRANZA_DELETE_MODE=off: como en las tablas incrementales, no se borra nada
+        # (tampoco por carga completa); una fila modificada deja también su versión anterior
+        print(f"   ℹ️  COBRANZA_DELETE_MODE={DELETE_MODE}: se conservan las {len(to_delete):,} filas que sobran en MySQL")
+        to_delete = []
+    
+    if len(to_delete) > DELETE_MAX_RATIO * existing_count:
+        print(f"   ℹ️  Cambió más de {DELETE_MAX_RATIO:.0%} de la tabla, carga completa")
+        return sync_table_full_refresh(table_name, conn, cursor, rows, hashes)
+    
+    # 5. Bajas primero (así las altas no se mezclan con las filas a borrar), después altas.
+    # Todo en una sola transacción: n8n ve la tabla anterior o la nueva, nunca una mezcla
+    soft = DELETE_MODE == 'soft'
+    if to_delete and soft and not has_column(cursor, table_name, 'deleted_at'):
+        # DDL antes de escribir: el ALTER hace COMMIT implícito
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN `deleted_at` DATETIME NULL")
+    if to_delete:
+        deleted = delete_ids(cursor, table_name, to_delete, soft=soft)
+        print(f"5. ✅ {deleted:,} {'dados de baja' if soft else 'eliminados'}")
+    if to_insert:
+        inserted = insert_rows(cursor, plan, to_insert)
+        print(f"6. ✅ {inserted:,} insertados")
+    conn.commit()
+    
+    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+    print(f"   📊 Total en MySQL: {cursor.fetchone()[0]:,}")
+    return True
+
+def sync_table_incremental(table_name, conn, cursor, state, socios_numsocio_list=None):
+    """Sincronización INCREMENTAL: INSERT nuevos, UPDATE cambios, DELETE (o baja lógica) de los que ya no están"""
     print(f"\n{'='*80}")
     print(f"TABLA: {table_name}")
     print('='*80)
@@ -351,25 +987,22 @@ def sync_table_incremental(table_name, conn, cursor, socios_numsocio_list=None):
     # 1. Leer Access
     print(f"1. Leyendo desde Access...")
     try:
-        rows = read_access_table(table_name, socios_numsocio_list)
+        rows = get_access_table(table_name, socios_numsocio_list)
         if not rows:
-            print(f"   ⚠️  Tabla vacía")
-            return
+            return sync_empty_table(cursor, table_name)
         print(f"   ✅ {len(rows):,} registros")
     except Exception as e:
         print(f"   ❌ Error: {e}")
-        return
+        return False
     
     # 2. Analizar columnas
     all_cols = list(OrderedDict.fromkeys(k for row in rows for k in row.keys()))
     print(f"2. Columnas: {len(all_cols)}")
+    plan = build_table_plan(table_name, all_cols)
     
     # 3. Verificar/crear tabla
     print(f"3. Verificando tabla...")
-    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-    table_exists = cursor.fetchone() is not None
-    
-    if not table_exists:
+    if not table_exists(cursor, table_name):
         print(f"   ℹ️  Tabla no existe, creando...")
         # Crear tabla (mismo código que sync_ALL.py)
         col_defs = ["`id` INT AUTO_INCREMENT PRIMARY KEY"]
@@ -392,167 +1025,273 @@ def sync_table_incremental(table_name, conn, cursor, socios_numsocio_list=None):
         cursor.execute(create_sql)
         print(f"   ✅ Tabla creada")
     
+    # Índices de TABLE_INDEXES (UNIQUE en la clave de negocio): solo se crean los que falten.
+    # Es DDL (COMMIT implícito), así que va antes de cualquier escritura de la tabla
+    created = ensure_indexes(cursor, table_name)
+    if created:
+        print(f"   📇 Índices creados: {', '.join(created)}")
+    
     # 4. Determinar columnas clave única
     unique_key_cols = get_unique_key_column(table_name, all_cols)
-    print(f"4. Clave única: {' + '.join(unique_key_cols)}")
+    key_codec = build_key_codec(unique_key_cols, get_column_types(cursor, table_name))
+    print(f"4. Clave única: {key_codec.signature.replace('|', ' + ')}")
     
-    # 5. Cargar registros existentes
-    print(f"5. Cargando registros de MySQL...")
-    existing_records = get_existing_records(cursor, table_name, unique_key_cols)
-    print(f"   ✅ {len(existing_records):,} registros existentes")
+    # 5. Hash y bucket de cada fila de Access (una sola vez: se reutilizan al insertar/actualizar)
+    keys = []
+    hashes = []
+    buckets = []
+    for row in rows:
+        keys.append(key_codec.from_row(row))
+        hashes.append(plan.row_hash(row))
+        buckets.append(access_key_bucket(row, unique_key_cols))
+
+    # Cargar registros existentes: del estado local si el checksum de MySQL no cambió,
+    # si no, solo los buckets de MySQL que difieren del estado
+    print(f"5. Cargando registros existentes...")
+    checksum = get_mysql_checksum(cursor, table_name)
+    existing_records, dirty_buckets, pulled_buckets, from_state = load_bucketed_records(
+        cursor, state, table_name, unique_key_cols, key_codec, checksum, access_bucket_checksums(buckets, hashes))
+    if from_state:
+        print(f"   ✅ {len(existing_records):,} registros desde estado local (MySQL sin cambios)")
+    else:
+        print(f"   ✅ {len(existing_records):,} registros existentes "
+              f"({pulled_buckets:,} de {DIFF_BUCKETS:,} buckets leídos de MySQL)")
+    max_id_before = checksum[2]
     
-    # 6. Clasificar operaciones
+    # 6. Clasificar operaciones: solo las filas de buckets que no coinciden con MySQL.
+    # Se buscan contra todos los registros, así una clave en otro bucket no se duplica
     print(f"6. Comparando datos...")
-    to_insert = []
     to_update = []
-    unchanged = 0
+    to_rehash = []
     
-    for row in rows:
-        # Obtener valor de la clave única (normalizado)
-        if len(unique_key_cols) == 1:
-            key_value = normalize_key_value(row.get(unique_key_cols[0], ''))
+    diff_idx = [i for i, bucket in enumerate(buckets) if bucket in dirty_buckets]
+    print(f"   🪣 Buckets distintos: {len(dirty_buckets):,} de {DIFF_BUCKETS:,} ({len(diff_idx):,} filas a comparar)")
+    sub_insert, sub_changed, unchanged = classify_rows(
+        [keys[i] for i in diff_idx], [hashes[i] for i in diff_idx], existing_records)
+    unchanged += len(rows) - len(diff_idx)
+    to_insert = [(rows[diff_idx[j]], hashes[diff_idx[j]]) for j in sub_insert]
+    for j, existing_id, existing_hash in sub_changed:
+        i = diff_idx[j]
+        row = rows[i]
+        if (len(existing_hash) == LEGACY_ROW_HASH_LENGTH and
+                calculate_legacy_row_hash(row, plan.hash_plan) == existing_hash):
+            # Sin cambios pero con hash SHA-256 viejo → solo se reescribe row_hash
+            unchanged += 1
+            to_rehash.append((keys[i], existing_id, hashes[i], existing_records[keys[i]][2]))
         else:
-            # Concatenar múltiples columnas con |
-            key_parts = [normalize_key_value(row.get(col, '')) for col in unique_key_cols]
-            key_value = '|'.join(key_parts)
-        
-        # Calcular hash completo del registro
-        full_hash = calculate_row_hash(row, all_cols)
-        
-        if key_value not in existing_records:
-            # Registro nuevo (clave no existe)
-            to_insert.append(row)
-        else:
-            # Registro existe, verificar si cambió algo
-            existing_id, existing_hash = existing_records[key_value]
-            if full_hash != existing_hash:
-                # Hash diferente → cambió algo → UPDATE
-                to_update.append((existing_id, row, full_hash))
-            else:
-                # Hash igual → sin cambios → SKIP
-                unchanged += 1
+            # Hash diferente → cambió algo → UPDATE
+            to_update.append((keys[i], existing_id, row, hashes[i], buckets[i]))
+    
+    # Filas que MySQL ya rechazó y no cambiaron desde entonces: no se reintentan
+    # (siguen fuera de MySQL o con la versión anterior hasta que cambien en Access)
+    rejected = pending_rejects(cursor, table_name, hashes)
+    if rejected:
+        pending = len(to_insert) + len(to_update)
+        to_insert = [(row, row_hash) for row, row_hash in to_insert if row_hash not in rejected]
+        to_update = [update for update in to_update if update[3] not in rejected]
+        if len(to_insert) + len(to_update) < pending:
+            print(f"   ⏭️  {pending - len(to_insert) - len(to_update):,} filas rechazadas antes y sin cambios: "
+                  f"se saltan ({REJECTS_TABLE})")
+    
+    # Bajas: claves de MySQL que ya no están en el Access filtrado
+    to_delete = []
+    if DELETE_MODE in ('hard', 'soft'):
+        to_delete = find_deleted_records(existing_records, set(keys), soft=DELETE_MODE == 'soft')
     
-    print(f"   📊 Nuevos: {len(to_insert):,} | Modificados: {len(to_update):,} | Sin cambios: {unchanged:,}")
+    print(f"   📊 Nuevos: {len(to_insert):,} | Modificados: {len(to_update):,} | "
+          f"Eliminados: {len(to_delete):,} | Sin cambios: {unchanged:,}")
+    changed_keys = set()
+    deleted_keys = set()
+    # Una fila con baja lógica que vuelve a aparecer en Access se reactiva en el UPDATE
+    has_deleted_at = has_column(cursor, table_name, 'deleted_at')
+    soft = DELETE_MODE == 'soft'
+    delete_blocked = len(to_delete) > DELETE_MAX_RATIO * len(existing_records)
+    if to_delete and soft and not delete_blocked and not has_deleted_at:
+        # DDL antes de escribir: el ALTER hace COMMIT implícito y partiría la transacción de la tabla
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN `deleted_at` DATETIME NULL")
     
+    # 7-8c. Altas, cambios y bajas en una sola transacción: se confirman juntos con un COMMIT
     # 7. Insertar nuevos
     if to_insert:
         print(f"7. Insertando {len(to_insert):,} registros nuevos...")
-        cursor.execute("SET FOREIGN_KEY_CHECKS=0")
-        
-        col_names = ', '.join([f'`{col}`' for col in all_cols])
-        placeholders = ', '.join(['%s'] * len(all_cols))
-        insert_sql = f"INSERT INTO `{table_name}` ({col_names}, row_hash) VALUES ({placeholders}, %s)"
-        
-        batch_size = 1000
-        inserted = 0
-        for i in range(0, len(to_insert), batch_size):
-            batch = to_insert[i:i+batch_size]
-            values = []
-            for row in batch:
-                row_vals = []
-                for col in all_cols:
-                    val = row.get(col) if row.get(col) else None
-                    # Convertir fechas
-                    col_upper = col.upper()
-                    if val and ('FEC' in col_upper or 'FECHA' in col_upper or 'DATE' in col_upper or 
-                               col_upper in ['PERLIQUIDANRO', 'F1CSOCIO', 'FBUSCAHR', 'ALTCOB', 'ALTSOCIO', 'BAJAFECHA']):
-                        val = convert_date_value(val)
-                    row_vals.append(val)
-                row_hash = calculate_row_hash(row, all_cols)
-                values.append(tuple(row_vals) + (row_hash,))
-            
-            try:
-                cursor.executemany(insert_sql, values)
-                inserted += len(batch)
-            except Exception as e:
-                print(f"   ⚠️  Error batch: {e}")
-                for val in values:
-                    try:
-                        cursor.execute(insert_sql, val)
-                        inserted += 1
-                    except:
-                        pass
-        
-        cursor.execute("SET FOREIGN_KEY_CHECKS=1")
+        inserted = insert_rows(cursor, plan, to_insert)
         print(f"   ✅ {inserted:,} insertados")
     
     # 8. Actualizar modificados
     if to_update:
-        print(f"8. Actualizando {len(to_update):,} registros modificados...")
-        set_clause = ', '.join([f"`{col}` = %s" for col in all_cols])
-        update_sql = f"UPDATE `{table_name}` SET {set_clause}, row_hash = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s"
-        
-        updated = 0
-        for existing_id, row, row_hash in to_update:
-            try:
-                vals = []
-                for col in all_cols:
-                    val = row.get(col) if row.get(col) else None
-                    # Convertir fechas
-                    col_upper = col.upper()
-                    if val and ('FEC' in col_upper or 'FECHA' in col_upper or 'DATE' in col_upper or 
-                               col_upper in ['PERLIQUIDANRO', 'F1CSOCIO', 'FBUSCAHR', 'ALTCOB', 'ALTSOCIO', 'BAJAFECHA']):
-                        val = convert_date_value(val)
-                    vals.append(val)
-                cursor.execute(update_sql, tuple(vals) + (row_hash, existing_id))
-                updated += 1
-            except Exception as e:
-                pass
-        
-        print(f"   ✅ {updated:,} actualizados")
+        print(f"8. Actualizando {len(to_update):,} registros modificados [{UPDATE_MODE}]...")
+        applied = update_rows(cursor, plan,
+                              [(existing_id, row, row_hash) for _, existing_id, row, row_hash, _ in to_update],
+                              reactivate=has_deleted_at)
+        for key_value, existing_id, row, row_hash, bucket in to_update:
+            if existing_id in applied:
+                existing_records[key_value] = (existing_id, row_hash, bucket)
+                changed_keys.add(key_value)
+        print(f"   ✅ {len(applied):,} actualizados")
     
-    # 9. Verificar total
-    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-    final_count = cursor.fetchone()[0]
-    print(f"   📊 Total en MySQL: {final_count:,}")
+    # 8b. Migrar row_hash viejos (SHA-256) sin tocar los datos ni updated_at
+    if to_rehash:
+        print(f"8b. Migrando row_hash de {len(to_rehash):,} registros sin cambios...")
+        rehash_sql = (f"INSERT INTO `{table_name}` (id, row_hash) VALUES (%s, %s) "
+                      "ON DUPLICATE KEY UPDATE row_hash = VALUES(row_hash), updated_at = updated_at")
+        rehash_values = [(existing_id, row_hash) for _, existing_id, row_hash, _ in to_rehash]
+        for batch in AdaptiveBatcher(cursor).split(rehash_values):
+            cursor.executemany(rehash_sql, batch)
+        for key_value, existing_id, row_hash, bucket in to_rehash:
+            existing_records[key_value] = (existing_id, row_hash, bucket)
+            changed_keys.add(key_value)
+        print(f"   ✅ {len(to_rehash):,} hashes migrados")
+    
+    # 8c. Propagar bajas: DELETE (o baja lógica) en lotes por rango de ids o IN
+    if to_delete:
+        if delete_blocked:
+            print(f"8c. ⚠️  {len(to_delete):,} de {len(existing_records):,} registros ya no están en Access; "
+                  f"supera COBRANZA_DELETE_MAX_RATIO={DELETE_MAX_RATIO}, no se elimina nada "
+                  f"(la tabla queda sin fingerprint y se revisa en la próxima sync)")
+        else:
+            print(f"8c. {'Dando de baja' if soft else 'Eliminando'} {len(to_delete):,} registros que ya no están en Access...")
+            deleted = delete_ids(cursor, table_name, [row_id for _, row_id in to_delete], soft=soft)
+            for key_value, row_id in to_delete:
+                if soft:
+                    existing_records[key_value] = (row_id, '', existing_records[key_value][2])
+                    changed_keys.add(key_value)
+                else:
+                    del existing_records[key_value]
+                    deleted_keys.add(key_value)
+            print(f"   ✅ {deleted:,} {'dados de baja' if soft else 'eliminados'}")
+    
+    # 9. COMMIT de la tabla, verificar total y guardar el estado local (ids de los insertados se leen de MySQL)
+    conn.commit()
+    if to_insert:
+        inserted_records = get_existing_records(cursor, table_name, unique_key_cols, key_codec, min_id=max_id_before)
+        existing_records.update(inserted_records)
+        changed_keys.update(inserted_records)
+    checksum = get_mysql_checksum(cursor, table_name)
+    print(f"   📊 Total en MySQL: {checksum[0]:,}")
+    try:
+        save_state_records(state, table_name, key_codec, checksum, existing_records,
+                           changed_keys if from_state else None, deleted_keys)
+    except sqlite3.Error as e:
+        print(f"   ⚠️  No se pudo guardar el estado local: {e}")
+    # Con bajas bloqueadas la tabla no quedó igual a Access: False = no guardar su fingerprint
+    # (ni el del archivo), así la próxima corrida la vuelve a comparar en vez de saltarla
+    return not (to_delete and delete_blocked)
+
+def main():
+    print("="*80)
+    print("SINCRONIZACIÓN INCREMENTAL - COBRADOR 30")
+    print("="*80)
 
-# MAIN
-print("="*80)
-print("SINCRONIZACIÓN INCREMENTAL - COBRADOR 30")
-print("="*80)
+    conn = get_mysql_connection()
+    cursor = conn.cursor()
+    state_path = STATE_DB_PATH
+    try:
+        open_state_store(state_path).close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Estado local no disponible ({e}), se lee todo desde MySQL")
+        state_path = ':memory:'
 
-conn = get_mysql_connection()
-cursor = conn.cursor()
+    results = {}
+    socios_numsocio_list = None
 
-results = {}
-socios_numsocio_list = None
+    # 0. Fingerprint del archivo: si Datos1.mdb no cambió desde la última sync, no hay nada que hacer
+    ensure_fingerprint_table(cursor)
+    ensure_rejects_table(cursor)
+    conn.commit()
+    fingerprints = load_fingerprints(cursor)
+    stored_file = fingerprints.get(FILE_FINGERPRINT_KEY)
+    file_fingerprint, file_stat = get_file_fingerprint(ACCESS_DB, stored_file)
 
-for table in TABLES:
-    try:
-        # Capturar NUMSOCIO de Socios para filtrar TbComentariosSocios
+    def sync_one(table, extracted_rows, extract_error):
+        """Sync de una tabla con su propia conexión del pool (corre en un hilo del scheduler)"""
+        nonlocal socios_numsocio_list
+        if extract_error is not None:
+            raise extract_error
+
+        # Capturar NUMSOCIO de Socios para filtrar TbComentariosSocios (que espera a Socios)
         if table == 'Socios':
-            socios_rows = read_access_table('Socios')
-            socios_numsocio_list = set([row.get('NUMSOCIO') for row in socios_rows if row.get('NUMSOCIO')])
+            socios_numsocio_list = get_socios_numsocio_list(extracted_rows)
             print(f"\n📋 Capturados {len(socios_numsocio_list)} NUMSOCIO de Socios para filtrar comentarios\n")
 
-        # Verificar si esta tabla requiere FULL REFRESH
-        if table in FULL_REFRESH_TABLES:
-            # Leer datos de Access
-            rows = read_access_table(table, socios_numsocio_list)
-            # Hacer DROP/CREATE/INSERT
-            sync_table_full_refresh(table, conn, cursor, rows)
-        else:
-            # Sincronización incremental normal
-            sync_table_incremental(table, conn, cursor, socios_numsocio_list)
+        with pooled_connection(sync_pool) as table_conn:
+            table_cursor = table_conn.cursor()
+            state = open_state_store(state_path)
+            try:
+                # Fingerprint de la tabla: si el contenido filtrado no cambió, saltarla
+                rows = get_access_table(table, socios_numsocio_list)
+                table_fingerprint = compute_table_fingerprint(rows)
+                stored_table = fingerprints.get(table)
+                skip = False
+                if not FORCE_SYNC and stored_table and stored_table['fingerprint'] == table_fingerprint:
+                    skip = count_mysql_rows(table_cursor, table) == stored_table['row_count']
 
-        cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
-        count = cursor.fetchone()[0]
-        results[table] = count
-    except Exception as e:
-        print(f"\n❌ Error en {table}: {e}")
-        results[table] = 0
-
-cursor.close()
-conn.close()
-
-# RESUMEN
-print("\n" + "="*80)
-print("RESUMEN FINAL")
-print("="*80)
-total = 0
-for table, count in results.items():
-    print(f"{table:30s}: {count:>10,} registros")
-    total += count
-print("-"*80)
-print(f"{'TOTAL':30s}: {total:>10,} registros")
-print("="*80)
+                if skip:
+                    print(f"\n⏭️  {table}: sin cambios desde la última sincronización, se salta")
+                    synced = True
+                elif table in FULL_REFRESH_TABLES:
+                    # Verificar si esta tabla requiere FULL REFRESH: tabla sombra + RENAME
+                    synced = sync_table_full_refresh(table, table_conn, table_cursor, rows)
+                elif table in MULTISET_TABLES:
+                    # Sin clave única: diff de multiconjunto de row_hash
+                    synced = sync_table_multiset(table, table_conn, table_cursor, rows)
+                else:
+                    # Sincronización incremental normal
+                    synced = sync_table_incremental(table, table_conn, table_cursor, state, socios_numsocio_list)
+
+                count = count_mysql_rows(table_cursor, table)
+                if synced:
+                    save_fingerprint(table_cursor, table, table_fingerprint, row_count=count)
+                table_conn.commit()
+                return count, synced
+            except Exception:
+                # Lo que quedó sin confirmar de la tabla se descarta entero
+                table_conn.rollback()
+                raise
+            finally:
+                state.close()
+                table_cursor.close()
+
+    if not FORCE_SYNC and stored_file and stored_file['fingerprint'] == file_fingerprint:
+        print(f"\n✅ Access sin cambios desde la última sincronización (fingerprint {file_fingerprint[:12]}), nada que hacer")
+        for table in TABLES:
+            results[table] = (fingerprints.get(table) or {}).get('row_count') or 0
+    else:
+        all_synced = True
+        # Una conexión por tabla en paralelo (COBRANZA_SYNC_WORKERS)
+        sync_pool = create_pool('cobranza_sync', SYNC_WORKERS, **sync_connection_options())
+        print(f"\n🔀 Sincronizando hasta {SYNC_WORKERS} tablas en paralelo")
+
+        # Las tablas se sincronizan a medida que termina su export (en paralelo) y sus dependencias
+        for table, result, error in run_table_syncs(TABLES, extract_access_tables(TABLES), sync_one,
+                                                    TABLE_DEPENDENCIES, SYNC_WORKERS):
+            if error is not None:
+                print(f"\n❌ Error en {table}: {error}")
+                results[table] = 0
+                all_synced = False
+            else:
+                results[table], synced = result
+                all_synced = all_synced and synced
+
+        # El fingerprint del archivo solo se guarda si todas las tablas quedaron sincronizadas
+        if all_synced:
+            save_fingerprint(cursor, FILE_FINGERPRINT_KEY, file_fingerprint, file_stat=file_stat)
+            conn.commit()
+
+    cursor.close()
+    conn.close()
+
+    # RESUMEN
+    print("\n" + "="*80)
+    print("RESUMEN FINAL")
+    print("="*80)
+    total = 0
+    for table in TABLES:
+        count = results.get(table, 0)
+        print(f"{table:30s}: {count:>10,} registros")
+        total += count
+    print("-"*80)
+    print(f"{'TOTAL':30s}: {total:>10,} registros")
+    print("="*80)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Plan de escritura de una tabla, compartido por sync_ALL.py y sync_INCREMENTAL.py.
+
+El plan se compila una vez por tabla: orden de columnas, un converter por columna
+(fecha o '' → NULL), el plan de hash y el INSERT. Las dos syncs arman las tuplas de
+parámetros (INSERT, UPDATE y TSV de LOAD DATA) con el mismo plan, así una carga
+completa y una incremental escriben exactamente los mismos valores.
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+from access_dates import date_converter
+from access_reader import access_text
+from row_hash import build_hash_plan, calculate_row_hash
+
+# 📅 FECHAS: sin esquema, las columnas de fecha se reconocen por nombre (igual que
+# infer_column_type de sync_INCREMENTAL.py). sync_ALL.py las toma del esquema de Access
+DATE_NAME_PARTS = ('FEC', 'FECHA', 'DATE')
+DATE_COLUMNS = ('PERLIQUIDANRO', 'F1CSOCIO', 'FBUSCAHR', 'ALTCOB', 'ALTSOCIO', 'BAJAFECHA')
+
+def is_date_column_name(col):
+    col_upper = col.upper()
+    return any(part in col_upper for part in DATE_NAME_PARTS) or col_upper in DATE_COLUMNS
+
+def date_converters(all_cols, date_columns=None):
+    """
+    Converter de fecha por columna, en el orden de all_cols (None = no es fecha).
+    date_columns: columnas de fecha según el esquema; sin él se decide por nombre
+    """
+    if date_columns is None:
+        return [date_converter(col) if is_date_column_name(col) else None for col in all_cols]
+    return [date_converter(col) if col in date_columns else None for col in all_cols]
+
+# Valores tipados del lector nativo que MySQL guarda igual que el texto de mdb-export;
+# el resto (fechas fuera de columnas de fecha, float, bytes) se escribe como ese texto
+_NATIVE_PASSTHROUGH_TYPES = (int, bool, Decimal)
+
+def blank_to_null(value):
+    """'' de mdb-export → NULL; un valor tipado del lector nativo se escribe como en mdb-export"""
+    value_type = type(value)
+    if value_type is str:
+        return value or None
+    if value is None or value_type in _NATIVE_PASSTHROUGH_TYPES:
+        return value
+    return access_text(value)
+
+def blank_column_to_null(values):
+    return [(value or None) if type(value) is str else blank_to_null(value) for value in values]
+
+# 🧩 PLAN DE TABLA: altas, cambios, full refresh y carga completa arman las tuplas de
+# parámetros con el plan, sin decidir nada (ni col.upper()) por celda
+TablePlan = namedtuple('TablePlan', ['table_name', 'columns', 'write_columns', 'hash_plan',
+                                     'insert_sql', 'row_hash', 'row_values', 'rows_values'])
+
+def build_table_plan(table_name, all_cols, date_columns=None):
+    """
+    Plan compilado de una tabla. write_columns = columnas + row_hash, en el orden de las tuplas.
+    date_columns: columnas de fecha según el esquema (sin él, por nombre)
+    insert_sql(target=None): INSERT a la tabla (o a `target`, ej. la tabla sombra)
+    row_values(fila, row_hash=None) / rows_values(filas, hashes=None): tuplas de parámetros;
+    sin hash se calcula. rows_values convierte por columnas (cada fecha distinta una vez)
+    """
+    columns = list(all_cols)
+    write_columns = columns + ['row_hash']
+    hash_plan = build_hash_plan(columns)
+    converters = date_converters(columns, date_columns)
+    cell_converters = [(col, convert or blank_to_null) for col, convert in zip(columns, converters)]
+    column_converters = [(col, convert.convert_column if convert is not None else blank_column_to_null)
+                         for col, convert in zip(columns, converters)]
+    col_names = ', '.join(f'`{col}`' for col in write_columns)
+    placeholders = ', '.join(['%s'] * len(write_columns))
+
+    def insert_sql(target=None):
+        return f"INSERT INTO `{target or table_name}` ({col_names}) VALUES ({placeholders})"
+
+    def row_hash(row):
+        return calculate_row_hash(row, hash_plan)
+
+    def row_values(row, hash_value=None):
+        values = [convert(row.get(col)) for col, convert in cell_converters]
+        values.append(hash_value if hash_value is not None else row_hash(row))
+        return tuple(values)
+
+    def rows_values(rows, hashes=None):
+        values = [convert_column([row.get(col) for row in rows]) for col, convert_column in column_converters]
+        values.append(hashes if hashes is not None else [row_hash(row) for row in rows])
+        return list(zip(*values))
+
+    return TablePlan(table_name, columns, write_columns, hash_plan,
+                     insert_sql, row_hash, row_values, rows_values)
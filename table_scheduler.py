@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Sincronización de tablas en paralelo respetando dependencias, compartida por
+sync_ALL.py y sync_INCREMENTAL.py.
+
+Cada tabla arranca apenas termina su extracción de Access y la sync de las tablas
+de las que depende (hoy solo TbComentariosSocios → Socios). Hasta `max_workers`
+tablas se sincronizan a la vez, cada una con su propia conexión del pool, así el
+tiempo total se acerca al de la tabla más lenta y no a la suma de todas.
+"""
+
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class _TableLog:
+    """
+    sys.stdout mientras corren tablas en paralelo: lo que imprime cada hilo de tabla se
+    junta y se vuelca entero al terminar, así los logs de dos tablas no se mezclan
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            with self.lock:
+                return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def start(self):
+        self.local.buffer = []
+
+    def finish(self):
+        text = ''.join(self.local.buffer or [])
+        self.local.buffer = None
+        with self.lock:
+            self.stream.write(text)
+            self.stream.flush()
+
+def _dependencies_of(table, dependencies, tables):
+    """Tablas de `tables` de las que depende `table` (dependencies: tabla → tabla o lista)"""
+    deps = dependencies.get(table) or []
+    if isinstance(deps, str):
+        deps = [deps]
+    return {dep for dep in deps if dep in tables}
+
+def run_table_syncs(tables, extracted, sync_one, dependencies, max_workers):
+    """
+    Sincronizar tablas en paralelo.
+
+    tables: todas las tablas de la corrida (para saber qué dependencias aplican)
+    extracted: iterable de (tabla, filas, error) a medida que termina cada extracción
+    sync_one(tabla, filas, error) → resultado; corre en un hilo con su propia conexión
+    dependencies: tabla → tabla(s) cuya sync tiene que terminar antes
+
+    Genera (tabla, resultado, error) a medida que termina cada tabla.
+    """
+    events = queue.Queue()
+    log = _TableLog(sys.stdout) if max_workers > 1 else None
+
+    def extract():
+        try:
+            for table, rows, error in extracted:
+                events.put(('extracted', table, (rows, error)))
+        except Exception as e:
+            events.put(('extract_failed', None, e))
+        events.put(('extract_end', None, None))
+
+    def run(table, rows, error):
+        if log:
+            log.start()
+        try:
+            outcome = (sync_one(table, rows, error), None)
+        except Exception as e:
+            outcome = (None, e)
+        # Volcar el log antes de avisar: tras el último 'done' se restaura sys.stdout
+        if log:
+            log.finish()
+        events.put(('done', table, outcome))
+
+    previous_stdout = sys.stdout
+    if log:
+        sys.stdout = log
+    extractor = threading.Thread(target=extract, daemon=True)
+    extractor.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            waiting = {}  # tabla extraída → (filas, error), esperando a sus dependencias
+            finished = set()
+            running = 0
+            extracting = True
+            while extracting or running or waiting:
+                kind, table, payload = events.get()
+                if kind == 'extract_end':
+                    extracting = False
+                elif kind == 'extract_failed':
+                    raise payload
+                elif kind == 'extracted':
+                    waiting[table] = payload
+                else:
+                    running -= 1
+                    finished.add(table)
+                    yield (table,) + payload
+
+                # Lanzar las tablas extraídas cuyas dependencias ya terminaron
+                for ready in [t for t in waiting if _dependencies_of(t, dependencies, tables) <= finished]:
+                    rows, error = waiting.pop(ready)
+                    executor.submit(run, ready, rows, error)
+                    running += 1
+
+                # Dependencias que nunca van a llegar (la tabla no se extrajo): lanzar igual
+                if not extracting and not running and waiting:
+                    for ready in list(waiting):
+                        rows, error = waiting.pop(ready)
+                        executor.submit(run, ready, rows, error)
+                        running += 1
+    finally:
+        sys.stdout = previous_stdout
+        extractor.join()
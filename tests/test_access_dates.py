@@ -0,0 +1,35 @@
+"""Tests de access_dates.py: conversión de fechas de Access por columna"""
+
+from datetime import datetime
+
+from access_dates import DateColumnConverter
+
+
+def test_mdb_export_dates_are_converted_and_format_is_detected():
+    convert = DateColumnConverter()
+    assert convert('01/27/22 00:00:00') == '2022-01-27 00:00:00'
+    assert convert.format == '%m/%d/%y %H:%M:%S'
+    # Otro formato en la misma columna: se prueba la lista completa
+    assert convert('12/31/1999') == '1999-12-31 00:00:00'
+
+
+def test_iso_and_native_dates_are_not_parsed():
+    convert = DateColumnConverter()
+    assert convert('2022-01-27 05:06:07') == '2022-01-27 05:06:07'
+    assert convert(datetime(2022, 1, 27, 5, 6, 7)) == '2022-01-27 05:06:07'
+    assert convert._convert_text.cache_info().misses == 1
+    assert convert.format is None
+
+
+def test_empty_and_invalid_values_are_null():
+    convert = DateColumnConverter()
+    assert convert('') is None
+    assert convert(None) is None
+    assert convert('sin fecha') is None
+
+
+def test_column_conversion_parses_each_distinct_value_once():
+    convert = DateColumnConverter()
+    values = ['01/27/22 00:00:00', '', '01/27/22 00:00:00', datetime(2022, 2, 1), '02/01/22 00:00:00'] * 100
+    assert convert.convert_column(values) == [convert(value) for value in values]
+    assert convert._convert_text.cache_info().misses == 2
@@ -0,0 +1,68 @@
+"""Tests de access_reader.py: el lector nativo entrega las mismas filas que mdb-export"""
+
+import shutil
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import access_reader
+from mdb_reader import MDB_EXPORT_DATE_FORMAT
+
+
+class _FakeDatabase:
+    """AccessDatabase con filas tipadas fijas"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __call__(self, path):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def iter_rows(self, table_name, predicate=None):
+        return iter(self.rows)
+
+
+ROW = {
+    'CODZONA': 7,
+    'IMPORTE': Decimal('0.0000'),
+    'ALTA': datetime(2022, 1, 27),
+    'ACTIVA': True,
+    'DESZONA': 'Centro',
+    'OBS': None,
+}
+
+
+def test_native_rows_keep_typed_values(monkeypatch):
+    monkeypatch.setattr(access_reader, 'AccessDatabase', _FakeDatabase([ROW]))
+    assert list(access_reader._iter_native_table('TblZonas')) == [ROW]
+
+
+def test_access_text_renders_like_mdb_export(monkeypatch):
+    monkeypatch.setattr(access_reader, 'NATIVE_DATE_FORMAT', MDB_EXPORT_DATE_FORMAT)
+    assert {col: access_reader.access_text(value) for col, value in ROW.items()} == {
+        'CODZONA': '7',
+        'IMPORTE': '0.0000',
+        'ALTA': '01/27/22 00:00:00',
+        'ACTIVA': '1',
+        'DESZONA': 'Centro',
+        'OBS': '',
+    }
+
+
+@pytest.mark.skipif(shutil.which('mdb-export') is None or not access_reader.os.path.exists(access_reader.ACCESS_DB),
+                    reason='requiere mdb-export y el Datos1.mdb real (COBRANZA_ACCESS_PATH)')
+def test_native_reader_matches_mdb_export():
+    try:
+        native = list(access_reader._iter_native_table('TblZonas'))
+    except ValueError as e:
+        pytest.skip(f"COBRANZA_ACCESS_PATH no es un .mdb: {e}")
+    rendered = [{col: access_reader.access_text(value) for col, value in row.items()} for row in native]
+    exported = list(access_reader._iter_mdb_export_table('TblZonas'))
+    assert native and sorted(tuple(row.items()) for row in rendered) == sorted(tuple(row.items()) for row in exported)
@@ -0,0 +1,134 @@
+"""Tests del lector nativo de Access (mdb_reader.py)"""
+
+import csv
+import io
+import os
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from mdb_reader import (COL_LONGINT, COL_NUMERIC, JET3, JET4, PAGE_DATA, ROW_DELETED, ROW_LOOKUP, AccessColumn,
+                        AccessDatabase, AccessTable, format_value)
+
+ACCESS_DB = os.getenv('COBRANZA_ACCESS_PATH',
+                      os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'Datos1.mdb'))
+
+# Tabla chica del archivo real para comparar contra mdb-export
+FIXTURE_TABLE = 'TblZonas'
+
+TDEF_PAGE = 7
+
+
+def _is_access_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(19)[4:] in (b'Standard Jet DB', b'Standard ACE DB')
+    except OSError:
+        return False
+
+
+def _data_page(rows):
+    """Página de datos Jet4 con `rows` = [(bytes, flags)], ubicadas desde el final como en Access"""
+    page = bytearray(JET4['page_size'])
+    page[0] = PAGE_DATA
+    struct.pack_into('<I', page, 4, TDEF_PAGE)
+    struct.pack_into('<H', page, JET4['row_count_offset'], len(rows))
+    end = JET4['page_size']
+    for i, (data, flags) in enumerate(rows):
+        start = end - len(data)
+        page[start:end] = data
+        struct.pack_into('<H', page, JET4['row_count_offset'] + 2 + i * 2, start | flags)
+        end = start
+    return bytes(page)
+
+
+def _longint_row(value):
+    """Fila de una tabla con una sola columna LONGINT: cantidad de columnas + valor + null mask"""
+    return struct.pack('<H', 1) + struct.pack('<i', value) + b'\x01'
+
+
+def _pointer(page_num, row):
+    return struct.pack('<I', (page_num << 8) | row)
+
+
+def _database(pages):
+    """AccessDatabase Jet4 sobre páginas en memoria (sin archivo)"""
+    db = AccessDatabase.__new__(AccessDatabase)
+    db.path = '<memoria>'
+    db._mm = b''.join(pages)
+    db.is_jet3 = False
+    db.fmt = JET4
+    db.page_size = JET4['page_size']
+    db._tables = None
+    db._table_defs = {}
+    db._iter_data_pages = lambda table: iter(range(1, len(pages)))
+    return db
+
+
+def _table():
+    column = AccessColumn(col_type=COL_LONGINT, num=0, var_num=0, fixed_offset=0, size=4,
+                          is_fixed=True, precision=0, scale=0)
+    column.name = 'ID'
+    return AccessTable('Prueba', TDEF_PAGE, [column], usage_map_pg_row=0)
+
+
+def test_lookup_row_is_read_from_its_target():
+    # Página 1: una fila normal y un puntero (ROW_LOOKUP) a la fila 0 de la página 2.
+    # Página 2: la fila movida, marcada como borrada para que el recorrido no la lea dos veces
+    db = _database([
+        bytes(JET4['page_size']),
+        _data_page([(_longint_row(1), 0), (_pointer(2, 0), ROW_LOOKUP)]),
+        _data_page([(_longint_row(2), ROW_DELETED)]),
+    ])
+    assert list(db._iter_table_rows(_table())) == [{'ID': 1}, {'ID': 2}]
+
+
+def test_invalid_lookup_pointer_fails():
+    db = _database([
+        bytes(JET4['page_size']),
+        _data_page([(b'\x00\x02', ROW_LOOKUP)]),
+    ])
+    with pytest.raises(ValueError):
+        list(db._iter_table_rows(_table()))
+
+
+@pytest.mark.skipif(shutil.which('mdb-export') is None or not _is_access_file(ACCESS_DB),
+                    reason='requiere mdb-export y el Datos1.mdb real (COBRANZA_ACCESS_PATH)')
+def test_table_matches_mdb_export():
+    result = subprocess.run(['mdb-export', ACCESS_DB, FIXTURE_TABLE], capture_output=True, text=True, check=True)
+    expected = [dict(row) for row in csv.DictReader(io.StringIO(result.stdout))]
+
+    with AccessDatabase(ACCESS_DB) as db:
+        actual = [{col: format_value(value) for col, value in row.items()} for row in db.iter_rows(FIXTURE_TABLE)]
+
+    assert actual and len(actual) == len(expected)
+    assert list(actual[0]) == list(expected[0])
+    assert sorted(tuple(row.items()) for row in actual) == sorted(tuple(row.items()) for row in expected)
+
+
+@pytest.mark.parametrize('fmt', [JET3, JET4], ids=['jet3', 'jet4'])
+def test_numeric_scale_uses_format_offsets(fmt):
+    # TDEF mínimo con una sola columna NUMERIC(18,2) y su nombre
+    buf = bytearray(fmt['tab_cols_start'] + fmt['col_entry_size'] + 8)
+    struct.pack_into('<H', buf, fmt['tab_num_cols'], 1)
+    entry = fmt['tab_cols_start']
+    buf[entry] = COL_NUMERIC
+    buf[entry + fmt['col_prec']] = 18
+    buf[entry + fmt['col_scale']] = 2
+    buf[entry + fmt['col_flags']] = 0x01
+    struct.pack_into('<H', buf, entry + fmt['col_size'], 17)
+    name = entry + fmt['col_entry_size']
+    if fmt is JET3:
+        buf[name:name + 4] = b'\x03IMP'
+    else:
+        buf[name:name + 8] = struct.pack('<H', 6) + 'IMP'.encode('utf-16-le')
+
+    db = _database([bytes(fmt['page_size'])])
+    db.is_jet3 = fmt is JET3
+    db.fmt = fmt
+    db.page_size = fmt['page_size']
+    db._read_tdef_buffer = lambda page_num: bytes(buf)
+    column = db._read_table_def('Prueba', TDEF_PAGE).columns[0]
+    assert (column.name, column.precision, column.scale) == ('IMP', 18, 2)
@@ -0,0 +1,179 @@
+"""Tests de mysql_writer.py: LOAD DATA, rechazos, pipeline y batches adaptativos"""
+
+import itertools
+
+import pytest
+
+import mysql_writer
+
+
+class _LoadDataCursor:
+    """Cursor falso: LOAD DATA lee el TSV como MySQL y termina con `warnings` warnings"""
+
+    def __init__(self, warnings):
+        self.warnings = warnings
+        self.statements = []
+        self.lines = []
+        self.rowcount = 0
+        self.warning_count = 0
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql.split()[0])
+        if sql.startswith('LOAD DATA'):
+            with open(params[0], 'rb') as f:
+                self.lines = f.read().decode().splitlines()
+            self.rowcount = len(self.lines)
+            self.warning_count = self.warnings
+            self._result = []
+        elif sql.startswith('SHOW WARNINGS'):
+            self._result = [('Warning', 1265, "Data truncated for column 'IMPORTE' at row 2")]
+        else:
+            self._result = []
+
+    def fetchall(self):
+        return self._result
+
+
+ROWS = [{'ID': '1', 'IMPORTE': '10.5'}, {'ID': '2', 'IMPORTE': 'abc'}]
+
+
+def _to_values(row):
+    return (row['ID'], row['IMPORTE'])
+
+
+def test_clean_load_data_is_kept(monkeypatch):
+    monkeypatch.setattr(mysql_writer, '_load_data_available', True)
+    cursor = _LoadDataCursor(warnings=0)
+    fallback_calls = []
+    loaded, method, _ = mysql_writer.bulk_load(cursor, 'Prueba__new', ['ID', 'IMPORTE'], ROWS, _to_values,
+                                               fallback_calls.append)
+    assert (loaded, method) == (2, 'LOAD DATA')
+    assert cursor.lines == ['1\t10.5', '2\tabc']
+    assert fallback_calls == []
+
+
+def test_load_data_with_warnings_falls_back_to_insert(monkeypatch):
+    monkeypatch.setattr(mysql_writer, '_load_data_available', True)
+    cursor = _LoadDataCursor(warnings=1)
+
+    def fallback(rows):
+        return len(rows) - 1  # el INSERT rechaza la fila mala (va a sync_rejects)
+
+    loaded, method, _ = mysql_writer.bulk_load(cursor, 'Prueba__new', ['ID', 'IMPORTE'], ROWS, _to_values, fallback)
+    assert (loaded, method) == (1, 'INSERT')
+    assert cursor.statements == ['LOAD', 'SHOW', 'TRUNCATE']
+    # Con warnings no se apaga LOAD DATA para las demás tablas
+    assert mysql_writer._load_data_available
+
+
+class _RejectsCursor:
+    """Cursor falso con sync_rejects en memoria: un registro por (tabla, row_hash), como el UNIQUE KEY"""
+
+    def __init__(self):
+        self.rejects = {}
+        self.rowcount = 0
+        self._result = []
+
+    def executemany(self, sql, params):
+        assert 'ON DUPLICATE KEY UPDATE' in sql
+        for table_name, row_hash, error, row_data in params:
+            self.rejects[(table_name, row_hash)] = (error, row_data)
+
+    def execute(self, sql, params=()):
+        if sql.startswith('SELECT row_hash'):
+            self._result = [(row_hash,) for table, row_hash in self.rejects if table == params[0]]
+        elif sql.startswith('DELETE'):
+            table_name, *hashes = params
+            gone = [key for key in self.rejects if key[0] == table_name and key[1] in hashes]
+            for key in gone:
+                del self.rejects[key]
+            self.rowcount = len(gone)
+
+    def fetchall(self):
+        return self._result
+
+
+def test_rejected_row_is_recorded_once_and_skipped_until_it_changes():
+    cursor = _RejectsCursor()
+    columns = ['ID', 'IMPORTE', 'row_hash']
+    reject = (('2', 'abc', 'h2'), "Incorrect decimal value: 'abc'")
+    mysql_writer.record_rejects(cursor, 'Prueba', [reject], columns)
+    mysql_writer.record_rejects(cursor, 'Prueba', [reject], columns)
+    assert list(cursor.rejects) == [('Prueba', 'h2')]
+
+    # Misma fila en Access: se salta
+    assert mysql_writer.pending_rejects(cursor, 'Prueba', ['h1', 'h2']) == {'h2'}
+    # La fila cambió (otro row_hash): se reintenta y el rechazo viejo se borra
+    assert mysql_writer.pending_rejects(cursor, 'Prueba', ['h1', 'h2b']) == set()
+    assert cursor.rejects == {}
+
+
+# 🚰 Pipeline
+
+def test_pipeline_loads_every_batch_in_order():
+    loaded = []
+
+    def load(batch):
+        loaded.extend(batch)
+        return len(batch)
+
+    assert mysql_writer.run_pipeline(range(23), lambda batch: [n * 2 for n in batch], load, batch_size=5) == 23
+    assert loaded == [n * 2 for n in range(23)]
+
+
+def _failing_rows():
+    yield 1
+    raise OSError('mdb-export terminó con error')
+
+
+@pytest.mark.parametrize('rows, transform, load, error', [
+    # Falla la extracción (el iterador de Access)
+    (_failing_rows, list, len, OSError),
+    # Falla la transformación de un batch
+    (lambda: range(10), lambda batch: 1 / 0, len, ZeroDivisionError),
+    # Falla la carga: la extracción de un iterador infinito se corta, no queda colgada
+    (itertools.count, list, lambda batch: 1 / 0, ZeroDivisionError),
+])
+def test_pipeline_propagates_errors_from_every_stage(rows, transform, load, error):
+    with pytest.raises(error):
+        mysql_writer.run_pipeline(rows(), transform, load, batch_size=3, queue_batches=1)
+
+
+# 📏 Batches adaptativos
+
+def _batcher(monkeypatch, max_allowed_packet=64 * 1024 * 1024, **kwargs):
+    monkeypatch.setattr(mysql_writer, '_max_allowed_packet', max_allowed_packet)
+    return mysql_writer.AdaptiveBatcher(None, **kwargs)
+
+
+def test_batches_are_cut_by_rows_and_by_bytes(monkeypatch):
+    batcher = _batcher(monkeypatch, start_rows=100)
+    assert [len(b) for b in batcher.split([('x',)] * 250)] == [100, 100, 50]
+
+    row = ('x' * 1000,)
+    per_row = mysql_writer.estimate_sql_bytes(row)
+    batcher = _batcher(monkeypatch, start_rows=100, max_bytes=per_row * 10)
+    assert [len(b) for b in batcher.split([row] * 25)] == [10, 10, 5]
+
+
+def test_bytes_limit_never_exceeds_half_of_max_allowed_packet(monkeypatch):
+    batcher = _batcher(monkeypatch, max_allowed_packet=1024 * 1024, max_bytes=16 * 1024 * 1024)
+    assert batcher.max_bytes == 512 * 1024
+
+
+def test_batch_size_follows_latency_within_bounds(monkeypatch):
+    batcher = _batcher(monkeypatch, start_rows=1000, target_seconds=1.0)
+    batcher.record(1000, 0.1)  # rápido y lleno: crece
+    assert batcher.rows == 1500
+    batcher.record(200, 0.1)   # rápido pero cortado por bytes o por el final: no crece
+    assert batcher.rows == 1500
+    batcher.record(1500, 2.0)  # lento: se achica
+    assert batcher.rows == 750
+    for _ in range(20):
+        batcher.record(batcher.rows, 5.0)
+    assert batcher.rows == mysql_writer.BATCH_MIN_ROWS
+    for _ in range(40):
+        batcher.record(batcher.rows, 0.01)
+    assert batcher.rows == mysql_writer.BATCH_MAX_ROWS
+    assert batcher.statements == 63
@@ -0,0 +1,38 @@
+"""Tests de row_hash.py: el valor guardado en MySQL no puede cambiar entre versiones"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import access_reader
+from mdb_reader import MDB_EXPORT_DATE_FORMAT
+from row_hash import LEGACY_ROW_HASH_LENGTH, build_hash_plan, calculate_legacy_row_hash, calculate_row_hash
+
+ROW = {'NUMSOCIO': '12', 'NOMSOCIO': 'Pérez', 'OBS': '', 'FEC': None}
+
+
+def test_hash_plan_is_sorted_and_independent_of_column_order():
+    assert build_hash_plan(['NUMSOCIO', 'FEC', 'OBS', 'NOMSOCIO']) == ('FEC', 'NOMSOCIO', 'NUMSOCIO', 'OBS')
+
+
+def test_row_hash_is_stable():
+    # Mismo valor que escribió sync_ALL.py hasta ahora: si cambia, todas las filas se ven modificadas
+    plan = build_hash_plan(ROW)
+    assert calculate_row_hash(ROW, plan) == 'f8156bc8653c16fafc18f1608698b0a9'
+    legacy = calculate_legacy_row_hash(ROW, plan)
+    assert len(legacy) == LEGACY_ROW_HASH_LENGTH
+    assert legacy == '2d90f52fd6134c371d50d735e72c3e97e0776dfd9da80f1af3c0e07c750a8af1'
+
+
+def test_empty_and_missing_values_hash_alike():
+    plan = build_hash_plan(ROW)
+    assert calculate_row_hash(dict(ROW, OBS=None, FEC=''), plan) == calculate_row_hash(ROW, plan)
+
+
+def test_native_typed_row_hashes_like_mdb_export_text(monkeypatch):
+    monkeypatch.setattr(access_reader, 'NATIVE_DATE_FORMAT', MDB_EXPORT_DATE_FORMAT)
+    typed = {'CODZONA': 7, 'IMPORTE': Decimal('0.0000'), 'ALTA': datetime(2022, 1, 27),
+             'ACTIVA': False, 'DESZONA': 'Centro', 'OBS': None}
+    text = {'CODZONA': '7', 'IMPORTE': '0.0000', 'ALTA': '01/27/22 00:00:00',
+            'ACTIVA': '0', 'DESZONA': 'Centro', 'OBS': ''}
+    plan = build_hash_plan(typed)
+    assert calculate_row_hash(typed, plan) == calculate_row_hash(text, plan)
@@ -0,0 +1,254 @@
+"""Tests de sync_INCREMENTAL.py: clasificación, estado local, buckets, bajas, multiset, claves y updates"""
+
+import zlib
+from decimal import Decimal
+
+import pytest
+
+import mysql_writer
+import sync_INCREMENTAL as sync
+
+H1, H2, H3 = '1' * 32, '2' * 32, '3' * 32
+LEGACY = 'a' * 64
+
+
+def _both_engines(keys, hashes, existing):
+    """(python, numpy) de la misma clasificación, comparables como conjuntos"""
+    pytest.importorskip('numpy')
+    python = sync.classify_rows(keys, hashes, existing)
+    numpy = sync._classify_rows_numpy(keys, hashes, existing)
+    return [(set(insert), set(changed), unchanged) for insert, changed, unchanged in (python, numpy)]
+
+
+@pytest.mark.parametrize('keys, existing', [
+    # Claves enteras
+    ([1, 2, 3, 4], {1: (10, H1), 2: (20, H1), 3: (30, H3), 9: (90, H1)}),
+    # Claves de texto
+    (['A', 'B', 'C', 'D'], {'A': (10, H1), 'B': (20, H1), 'C': (30, H3), 'Z': (90, H1)}),
+    # Claves compuestas (tuplas)
+    ([(1, 'A'), (1, 'B'), (2, 'A'), (3, 'C')], {(1, 'A'): (10, H1), (1, 'B'): (20, H1), (2, 'A'): (30, H3)}),
+    # float no entero: no puede coincidir con el int truncado (30.5 ≠ 30)
+    ([30.5, 2, 3, 4], {30: (10, H1), 2: (20, H1), 3: (30, H3)}),
+])
+def test_numpy_classification_matches_python(keys, existing):
+    hashes = [H1, H2, H3, H1]
+    python, numpy = _both_engines(keys, hashes, existing)
+    assert python == numpy
+
+
+def test_numpy_classification_handles_legacy_and_soft_deleted_hashes():
+    existing = {1: (10, LEGACY), 2: (20, ''), 3: (30, H3)}
+    python, numpy = _both_engines([1, 2, 3], [H1, H2, H3], existing)
+    assert python == numpy == (set(), {(0, 10, LEGACY), (1, 20, '')}, 1)
+
+
+def test_classification_without_existing_records_inserts_everything():
+    assert sync.classify_rows([1, 2], [H1, H2], {}) == ([0, 1], [], 0)
+
+
+# 📦 Estado local
+
+INT_CODEC = sync.build_key_codec(['NUMCOB'], {'NUMCOB': 'int(11)'})
+PAIR_CODEC = sync.build_key_codec(['NUMSOCIO', 'NOMSOCIO'], {'NUMSOCIO': 'varchar(255)', 'NOMSOCIO': 'varchar(255)'})
+
+
+def test_state_records_round_trip_while_checksum_matches():
+    state = sync.open_state_store(':memory:')
+    records = {('12', 'Pérez'): (1, H1, 7), ('13', 'Gómez'): (2, H2, 9)}
+    sync.save_state_records(state, 'Socios', PAIR_CODEC, (2, 555, 2), records)
+
+    assert sync.load_state_records(state, 'Socios', PAIR_CODEC, (2, 555, 2)) == records
+    # MySQL cambió por fuera (otro checksum) o cambió la clave: el estado no sirve
+    assert sync.load_state_records(state, 'Socios', PAIR_CODEC, (2, 556, 2)) is None
+    assert sync.load_state_records(state, 'Socios', INT_CODEC, (2, 555, 2)) is None
+    assert sync.load_state_records(state, 'Cobradores', PAIR_CODEC) is None
+
+
+def test_state_records_incremental_save_rewrites_only_changed_and_deleted_keys():
+    state = sync.open_state_store(':memory:')
+    sync.save_state_records(state, 'Cobradores', INT_CODEC, (3, 1, 3), {1: (1, H1, 0), 2: (2, H1, 0), 3: (3, H1, 0)})
+
+    records = {1: (1, H2, 0), 3: (3, H1, 0), 4: (4, H3, 1)}
+    sync.save_state_records(state, 'Cobradores', INT_CODEC, (3, 2, 4), records, changed_keys={1, 4}, deleted_keys={2})
+    assert sync.load_state_records(state, 'Cobradores', INT_CODEC, (3, 2, 4)) == records
+
+
+def test_state_store_with_old_version_is_discarded(tmp_path):
+    path = str(tmp_path / 'state.sqlite')
+    state = sync.open_state_store(path)
+    sync.save_state_records(state, 'Cobradores', INT_CODEC, (1, 1, 1), {1: (1, H1, 0)})
+    state.execute("PRAGMA user_version = 1")
+    state.close()
+
+    state = sync.open_state_store(path)
+    assert sync.load_state_records(state, 'Cobradores', INT_CODEC) is None
+    state.close()
+
+
+# 🪣 Buckets
+
+def _mysql_bucket(*values):
+    """CRC32(CONCAT_WS('|', COALESCE(CAST(col AS CHAR), ''))) % DIFF_BUCKETS, como lo calcula MySQL"""
+    text = '|'.join('' if value is None else str(value) for value in values)
+    return zlib.crc32(text.encode()) % sync.DIFF_BUCKETS
+
+
+def test_access_bucket_matches_mysql_for_text_and_typed_keys():
+    key_cols = ['NUMSOCIO', 'NOMSOCIO']
+    expected = _mysql_bucket('12', 'Pérez')
+    assert sync.access_key_bucket({'NUMSOCIO': '12', 'NOMSOCIO': 'Pérez'}, key_cols) == expected
+    # Lector nativo: int tipado, mismo texto que guarda MySQL
+    assert sync.access_key_bucket({'NUMSOCIO': 12, 'NOMSOCIO': 'Pérez'}, key_cols) == expected
+    # NULL y '' caen en el mismo bucket (COALESCE(..., ''))
+    assert (sync.access_key_bucket({'NUMSOCIO': None, 'NOMSOCIO': 'Pérez'}, key_cols) ==
+            sync.access_key_bucket({'NUMSOCIO': '', 'NOMSOCIO': 'Pérez'}, key_cols) == _mysql_bucket(None, 'Pérez'))
+
+
+def test_state_checksums_match_access_when_nothing_changed():
+    rows = [{'NUMCOB': str(n)} for n in range(50)]
+    buckets = [sync.access_key_bucket(row, ['NUMCOB']) for row in rows]
+    hashes = [f'{n:032x}' for n in range(50)]
+    records = {n: (n + 1, row_hash, bucket) for n, (row_hash, bucket) in enumerate(zip(hashes, buckets))}
+    state_sums = {b: sums[:2] for b, sums in sync.state_bucket_checksums(records).items()}
+    assert state_sums == sync.access_bucket_checksums(buckets, hashes)
+
+
+def test_only_changed_buckets_are_compared_when_state_is_current():
+    rows = [{'NUMCOB': str(n)} for n in range(50)]
+    buckets = [sync.access_key_bucket(row, ['NUMCOB']) for row in rows]
+    hashes = [f'{n:032x}' for n in range(50)]
+    records = {n: (n + 1, row_hash, bucket) for n, (row_hash, bucket) in enumerate(zip(hashes, buckets))}
+    checksum = (50, 1234, 50)
+    state = sync.open_state_store(':memory:')
+    sync.save_state_records(state, 'Cobradores', INT_CODEC, checksum, records)
+
+    hashes[7] = H1  # cambió una fila en Access
+    # Estado vigente: no se consulta MySQL (sin cursor)
+    loaded, dirty, pulled, from_state = sync.load_bucketed_records(
+        None, state, 'Cobradores', ['NUMCOB'], INT_CODEC, checksum, sync.access_bucket_checksums(buckets, hashes))
+    assert (loaded, dirty, pulled, from_state) == (records, {buckets[7]}, 0, True)
+
+
+# 🗑️ Bajas
+
+class _RecordingCursor:
+    """Cursor falso: guarda cada statement y cuenta como afectados los ids pedidos"""
+
+    def __init__(self):
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, params))
+        self.rowcount = params[1] - params[0] + 1 if 'BETWEEN' in sql else len(params)
+
+
+def test_delete_ids_uses_ranges_for_long_runs_and_in_for_the_rest():
+    run = list(range(100, 100 + sync.DELETE_RANGE_MIN))
+    short = [5, 6, 7, 40]
+    cursor = _RecordingCursor()
+    assert sync.delete_ids(cursor, 'Liquidaciones', short + run[::-1], batch_size=3) == len(run) + len(short)
+    assert cursor.statements == [
+        ("DELETE FROM `Liquidaciones` WHERE id BETWEEN %s AND %s", (run[0], run[-1])),
+        ("DELETE FROM `Liquidaciones` WHERE id IN (%s, %s, %s)", (5, 6, 7)),
+        ("DELETE FROM `Liquidaciones` WHERE id IN (%s)", (40,)),
+    ]
+
+
+def test_soft_delete_marks_rows_and_skips_already_deleted():
+    existing = {1: (10, H1, 0), 2: (20, '', 0), 3: (30, H3, 0)}
+    assert sync.find_deleted_records(existing, {3}) == [(1, 10), (2, 20)]
+    assert sync.find_deleted_records(existing, {3}, soft=True) == [(1, 10)]
+
+    cursor = _RecordingCursor()
+    sync.delete_ids(cursor, 'Liquidaciones', [10], soft=True)
+    assert cursor.statements == [("UPDATE `Liquidaciones` SET deleted_at = CURRENT_TIMESTAMP, row_hash = NULL "
+                                  "WHERE id IN (%s)", (10,))]
+
+
+# 🧮 Multiset
+
+def test_multiset_diff_keeps_oldest_duplicates():
+    # MySQL: dos filas iguales (H1) y una que ya no está en Access (H3), de id mayor a menor
+    mysql_rows = [(40, H3), (30, H1), (20, H1), (10, H2)]
+    access_hashes = [H1, H2, H1, H1, H2]
+    insert_idx, delete, unchanged = sync.multiset_diff(access_hashes, mysql_rows)
+    # Sobra un H1 y un H2 en Access; H3 sobra en MySQL
+    assert (insert_idx, delete, unchanged) == ([3, 4], [40], 3)
+
+
+def test_multiset_diff_removes_surplus_duplicates_from_mysql():
+    mysql_rows = [(30, H1), (20, H1), (10, H1)]
+    insert_idx, delete, unchanged = sync.multiset_diff([H1], mysql_rows)
+    # Se conserva el id más viejo
+    assert (insert_idx, sorted(delete), unchanged) == ([], [20, 30], 1)
+
+
+# 🔑 Codecs de clave
+
+def test_int_codec_matches_access_text_typed_values_and_mysql():
+    codec = sync.build_key_codec(['NUMCOB'], {'NUMCOB': 'int(11)'})
+    assert codec.signature == 'NUMCOB:int'
+    assert codec.from_row({'NUMCOB': '30'}) == codec.from_row({'NUMCOB': 30}) == codec.from_values((30,)) == 30
+    # Decimal de MySQL o '30.0' de Access: misma clave entera; un no entero no se trunca
+    assert codec.from_values((Decimal('30.0000'),)) == codec.from_row({'NUMCOB': '30.0'}) == 30
+    assert codec.from_row({'NUMCOB': '30.5'}) == 30.5
+    assert codec.from_row({'NUMCOB': ''}) is codec.from_row({}) is None
+
+
+def test_text_codec_strips_spaces():
+    codec = sync.build_key_codec(['NUMSOCIO'], {'NUMSOCIO': 'varchar(255)'})
+    assert codec.signature == 'NUMSOCIO:text'
+    assert codec.from_row({'NUMSOCIO': ' 0012 '}) == codec.from_values(('0012',)) == '0012'
+    assert codec.from_row({'NUMSOCIO': None}) == ''
+
+
+def test_composite_codec_builds_tuples_per_column_kind():
+    codec = sync.build_key_codec(['COBLIQUIDA', 'CUPLIQUIDA'], {'COBLIQUIDA': 'int(11)', 'CUPLIQUIDA': 'varchar(50)'})
+    assert codec.signature == 'COBLIQUIDA:int|CUPLIQUIDA:text'
+    assert codec.from_row({'COBLIQUIDA': '30', 'CUPLIQUIDA': 'A1 '}) == codec.from_values((30, 'A1')) == (30, 'A1')
+
+
+# ✏️ Updates
+
+class _WriteCursor:
+    """Cursor falso: MySQL rechaza cualquier statement con el valor 'bad'; guarda lo escrito"""
+
+    def __init__(self):
+        self.written = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.executemany(sql, [params] if params is not None else [])
+
+    def executemany(self, sql, seq):
+        rows = list(seq)
+        if any('bad' in row for row in rows):
+            raise ValueError("Incorrect string value: 'bad'")
+        self.written.append((sql, rows))
+
+    def rows_for(self, prefix):
+        return [row for sql, rows in self.written if sql.startswith(prefix) for row in rows]
+
+
+UPDATES = [(10, {'NUMCOB': '1', 'NOMCOB': 'Ana'}, H1), (20, {'NUMCOB': '2', 'NOMCOB': 'bad'}, H2)]
+
+
+@pytest.mark.parametrize('mode, prefix, expected', [
+    ('staging', 'INSERT INTO `Cobradores__staging`', (10, '1', 'Ana', H1)),
+    ('upsert', 'INSERT INTO `Cobradores` (`id`', (10, '1', 'Ana', H1)),
+    ('row', 'UPDATE `Cobradores` SET', ('1', 'Ana', H1, 10)),
+])
+def test_update_modes_apply_good_rows_and_reject_bad_ones(monkeypatch, mode, prefix, expected):
+    monkeypatch.setattr(mysql_writer, '_max_allowed_packet', 64 * 1024 * 1024)
+    plan = sync.build_table_plan('Cobradores', ['NUMCOB', 'NOMCOB'])
+    cursor = _WriteCursor()
+
+    assert sync.update_rows(cursor, plan, UPDATES, reactivate=True, mode=mode) == {10}
+    assert cursor.rows_for(prefix) == [expected]
+    assert any('deleted_at = NULL' in sql for sql, _ in cursor.written)
+    if mode == 'staging':
+        # Un solo UPDATE … JOIN para todas las filas
+        assert sum(sql.startswith('UPDATE `Cobradores` t JOIN') for sql, _ in cursor.written) == 1
+    # La fila rechazada va a sync_rejects con su row_hash (se saltea hasta que cambie)
+    assert [row[:2] for row in cursor.rows_for('INSERT INTO `sync_rejects`')] == [('Cobradores', H2)]
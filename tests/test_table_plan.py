@@ -0,0 +1,41 @@
+"""Tests de table_plan.py: las dos syncs arman los mismos parámetros para una fila"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import access_reader
+from mdb_reader import MDB_EXPORT_DATE_FORMAT
+from row_hash import build_hash_plan, calculate_row_hash
+from table_plan import blank_to_null, build_table_plan
+
+ROW = {'NUMCOB': '30', 'NOMCOB': 'Ana', 'FECALTA': '01/27/22 00:00:00', 'OBS': ''}
+
+
+def test_plan_builds_insert_and_values_in_column_order():
+    plan = build_table_plan('Cobradores', list(ROW))
+    assert plan.write_columns == ['NUMCOB', 'NOMCOB', 'FECALTA', 'OBS', 'row_hash']
+    assert plan.insert_sql('Cobradores__new') == (
+        "INSERT INTO `Cobradores__new` (`NUMCOB`, `NOMCOB`, `FECALTA`, `OBS`, `row_hash`) VALUES (%s, %s, %s, %s, %s)")
+    row_hash = calculate_row_hash(ROW, build_hash_plan(ROW))
+    assert plan.row_values(ROW) == ('30', 'Ana', '2022-01-27 00:00:00', None, row_hash)
+    # Por columnas (batches) da lo mismo que fila por fila
+    assert plan.rows_values([ROW, ROW]) == [plan.row_values(ROW)] * 2
+
+
+def test_schema_date_columns_replace_the_name_heuristic():
+    plan = build_table_plan('Cobradores', ['ALTA', 'FECALTA'], date_columns={'ALTA'})
+    assert plan.row_values({'ALTA': '01/27/22 00:00:00', 'FECALTA': '01/27/22'}, 'h')[:2] == (
+        '2022-01-27 00:00:00', '01/27/22')
+
+
+def test_native_typed_values_are_written_like_mdb_export(monkeypatch):
+    monkeypatch.setattr(access_reader, 'NATIVE_DATE_FORMAT', MDB_EXPORT_DATE_FORMAT)
+    assert blank_to_null('') is None and blank_to_null(None) is None
+    # Números y bool van tipados; fechas fuera de columnas de fecha y float como el texto de mdb-export
+    assert [blank_to_null(v) for v in (30, True, Decimal('1.5000'), datetime(2022, 1, 27), 1.25)] == [
+        30, True, Decimal('1.5000'), '01/27/22 00:00:00', '1.25']
+
+    plan = build_table_plan('Cobradores', ['NUMCOB', 'FECALTA', 'IMPORTE'])
+    typed = {'NUMCOB': 30, 'FECALTA': datetime(2022, 1, 27), 'IMPORTE': Decimal('1.5000')}
+    text = {'NUMCOB': '30', 'FECALTA': '01/27/22 00:00:00', 'IMPORTE': '1.5000'}
+    assert plan.row_values(typed) == (30, '2022-01-27 00:00:00', Decimal('1.5000'), plan.row_hash(text))
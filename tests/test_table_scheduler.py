@@ -0,0 +1,73 @@
+"""Tests de table_scheduler.py: dependencias, errores y logs de tablas en paralelo"""
+
+import threading
+import time
+
+from table_scheduler import run_table_syncs
+
+TABLES = ['Socios', 'TbComentariosSocios', 'TblZonas']
+DEPENDENCIES = {'TbComentariosSocios': 'Socios'}
+
+
+def _extracted(order):
+    """Extracciones en el orden dado: (tabla, filas, error)"""
+    return [(table, [{'TABLA': table}], None) for table in order]
+
+
+def test_dependent_table_waits_for_its_dependency():
+    events = []
+    lock = threading.Lock()
+
+    def sync_one(table, rows, error):
+        with lock:
+            events.append(('start', table))
+        time.sleep(0.05 if table == 'Socios' else 0)
+        with lock:
+            events.append(('end', table))
+        return len(rows)
+
+    # TbComentariosSocios se extrae primero, pero no arranca hasta que termina Socios
+    results = list(run_table_syncs(TABLES, _extracted(['TbComentariosSocios', 'TblZonas', 'Socios']),
+                                   sync_one, DEPENDENCIES, max_workers=3))
+    assert sorted(results) == sorted((table, 1, None) for table in TABLES)
+    assert events.index(('end', 'Socios')) < events.index(('start', 'TbComentariosSocios'))
+
+
+def test_errors_are_reported_per_table():
+    extract_error = RuntimeError('mdb-export falló')
+
+    def sync_one(table, rows, error):
+        if error is not None:
+            raise error
+        if table == 'TblZonas':
+            raise ValueError('tabla rota')
+        return len(rows)
+
+    extracted = [('Socios', [{}], None), ('TbComentariosSocios', None, extract_error), ('TblZonas', [{}], None)]
+    results = {table: (result, error) for table, result, error in
+               run_table_syncs(TABLES, extracted, sync_one, DEPENDENCIES, max_workers=2)}
+    assert results['Socios'] == (1, None)
+    assert results['TbComentariosSocios'] == (None, extract_error)
+    assert results['TblZonas'][0] is None and isinstance(results['TblZonas'][1], ValueError)
+
+
+def test_dependency_missing_from_run_does_not_block():
+    results = list(run_table_syncs(['TbComentariosSocios'], _extracted(['TbComentariosSocios']),
+                                   lambda table, rows, error: len(rows), DEPENDENCIES, max_workers=2))
+    assert results == [('TbComentariosSocios', 1, None)]
+
+
+def test_parallel_table_logs_are_printed_whole(capsys):
+    def sync_one(table, rows, error):
+        print(f"{table}: inicio")
+        time.sleep(0.02)
+        print(f"{table}: fin")
+        return len(rows)
+
+    list(run_table_syncs(TABLES, _extracted(TABLES), sync_one, {}, max_workers=3))
+    lines = capsys.readouterr().out.splitlines()
+    # Cada tabla con sus dos líneas juntas, y todas volcadas antes de terminar la corrida
+    assert sorted(lines) == sorted(f"{table}: {step}" for table in TABLES for step in ('inicio', 'fin'))
+    for table in TABLES:
+        start = lines.index(f"{table}: inicio")
+        assert lines[start + 1] == f"{table}: fin"